@@ -5,9 +5,9 @@ from tkcolorpicker import askcolor
 from PIL import Image, ImageTk, ImageFont
 import tkinter.font as tkfont
 import os, ctypes
-import io
-import cairosvg
 import json
+from raster_cache import load_image
+from tag_pills import pill_image
 
 with open("tag_color_mapping.json", "r") as f:
     TAG_COLOR_MAP = json.load(f)
@@ -32,18 +32,8 @@ IMPERIAL_NUMERALS = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X"
 
 def load_svg_as_photoimage(svg_path, size=(60, 60), tint="#FFFFFF"):
     try:
-        # Render the SVG to PNG bytes
-        png_data = cairosvg.svg2png(url=svg_path, output_width=size[0], output_height=size[1])
-        image = Image.open(io.BytesIO(png_data)).convert("RGBA")
-        image.thumbnail(size, Image.LANCZOS)
-
-        # Create solid fill image
-        solid = Image.new("RGBA", image.size, tint)
-
-        # Mask the non-transparent pixels
-        alpha = image.getchannel("A")
-        tinted = Image.composite(solid, Image.new("RGBA", image.size, (0, 0, 0, 0)), mask=alpha)
-
+        # Rasterized and tinted through the shared on-disk cache
+        tinted = load_image(svg_path, size=size, color=tint)
         return ImageTk.PhotoImage(tinted)
     except Exception as e:
         print(f"[ERROR] Failed to tint SVG {svg_path}: {e}")
@@ -779,18 +769,7 @@ class IconPickerDialog(tk.Toplevel):
 
     def render_tag_pills(self, parent, tags):
         for tag in tags:
-            bg, fg = TAG_COLOR_MAP.get(tag, ("#444444", "#FFFFFF"))
-            pill = tk.Label(
-                parent,
-                text=tag,
-                bg=bg,
-                fg=fg,
-                font=("Arial", 9, "bold"),
-                padx=6,
-                pady=2,
-                borderwidth=1,
-                relief="solid"
-            )
+            pill = tk.Label(parent, image=pill_image(tag, size=12), bg=parent["bg"], bd=0)
             pill.pack(side="left", padx=(0, 5), pady=2)
 
     def update_card_bg(self, frame):
@@ -12,8 +12,7 @@ from icon_parsing import load_icon_entries
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A5, landscape
 from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from font_registry import register_font
 from reportlab.lib.utils import ImageReader
 from svglib.svglib import svg2rlg
 from reportlab.graphics import renderPDF
@@ -21,34 +20,35 @@ from bs4 import BeautifulSoup
 import tempfile
 import random
 from io import BytesIO
-from globals import get_cached_icon, COLOR_BG, COLOR_FG, FONT_DEFAULT, TAG_COLOR_MAP
+from globals import COLOR_BG, COLOR_FG, FONT_DEFAULT, TAG_COLOR_MAP
 from font_picker_dialog import FontPickerDialog
 from preview_window import open_preview_window
 from icon_picker_dialog_v2 import IconPickerDialogV2
+from icon_warmup import IconWarmup
+from tag_index import TagIndex
+from layout_model import Layout
+from render_service import start_render_service, stop_render_service
+from icon_grid import SectionGrid, ROW_PITCH
+from export_queue import start_export_queue, stop_export_queue
+from export_progress import ExportProgressBar
 
 # --- Constants ---
 APP_WIDTH = 1360
 APP_HEIGHT = 860
 GRID_COLUMNS = 10
 GRID_ROWS = 5
-CELL_SIZE = 60
 SECTIONS = ["Left Shoulder", "Right Shoulder", "Gothic Numerals", "Imperial Numerals"]
 COLOR_BG = "#1e1e1e"
 COLOR_FG = "#ffffff"
 ICON_DIR = "icons"
 FONT_DEFAULT = "Arial"
 
-# --- Global Icon Cache ---
-ICON_CACHE = {}
-
 # --- Helper Functions ---
 
 def register_custom_font(font_name, ttf_path):
-    if font_name not in pdfmetrics.getRegisteredFontNames():
-        if os.path.exists(ttf_path):
-            pdfmetrics.registerFont(TTFont(font_name, ttf_path))
-        else:
-            print(f"[WARNING] Font file not found: {ttf_path}")
+    if os.path.exists(ttf_path):
+        return register_font(font_name, ttf_path)
+    print(f"[WARNING] Font file not found: {ttf_path}")
 
 # --- GUI Application ---
 class IconGridApp(tk.Tk):
@@ -64,13 +64,17 @@ class IconGridApp(tk.Tk):
         self.grid_cells["Gothic Numerals"] = {}
         self.grid_cells["Imperial Numerals"] = {}
         self.icon_entries = load_icon_entries(ICON_DIR)
-
-        for entry in self.icon_entries:
-            if not hasattr(entry, "thumbnail"):
-                entry.thumbnail = get_cached_icon(entry.file, size=(40, 40), color=COLOR_FG)
+        self.tag_index = TagIndex(self.icon_entries)
+        start_render_service(self)
+        self.export_queue = start_export_queue(self)
+        self._cell_listeners = []
+        self._dirty_cells = set()
+        self._dirty_after = None
+        self.sel_cell = None
 
         self.create_titlebar()
         self.create_toolbar()
+        self.start_icon_warmup()
         self.create_widgets()
         self.prefill_numerals()
         self.bind_events()
@@ -145,6 +149,10 @@ class IconGridApp(tk.Tk):
         self.generate_button.pack(side="left", padx=5, pady= 4)
         debug_btn = tk.Button(self.toolbar, text="Debug", bg="#555", fg="white", relief="flat", command=self.run_debug_randomize)
         debug_btn.pack(side=RIGHT, padx=(10, 5))
+        self.status_label = tk.Label(self.toolbar, text="", bg="#111111", fg="#888888", font=(FONT_DEFAULT, 9))
+        self.status_label.pack(side=RIGHT, padx=10)
+        # Packs itself to the right while an export is running or queued
+        self.export_progress = ExportProgressBar(self.toolbar, self.export_queue, font=(FONT_DEFAULT, 9))
         self.file_menu_frame = tk.Frame(self, bg="#222222", bd=1, relief="solid")
         self.file_menu_visible = False
         self.create_file_menu()
@@ -188,10 +196,9 @@ class IconGridApp(tk.Tk):
             for row in range(GRID_ROWS):
                 icon_entry = random.choice(icon_files)
                 tint = random_color()
-                img = get_cached_icon(icon_entry.file, size=(CELL_SIZE - 6, CELL_SIZE - 6), color=tint)
                 for col in range(GRID_COLUMNS):
                     cell = self.grid_cells[section][(row, col)]
-                    cell.set_icon(img, path=icon_entry.file, tint=tint)
+                    cell.load_icon(icon_entry.file, tint=tint)
 
         for section in bottom_sections:
             for row in range(GRID_ROWS):
@@ -204,6 +211,28 @@ class IconGridApp(tk.Tk):
 
         print("[DEBUG] Randomization complete.")
 
+    def start_icon_warmup(self):
+        # Rasterize the library in worker processes so the picker and grid open hot
+        def on_progress(done, total):
+            self.status_label.config(text=f"Preparing icons {done}/{total}")
+
+        def on_done():
+            self.status_label.config(text="")
+
+        self.icon_warmup = IconWarmup(
+            self,
+            [entry.file for entry in self.icon_entries],
+            on_progress=on_progress,
+            on_done=on_done
+        )
+        self.icon_warmup.start()
+
+    def quit(self):
+        self.icon_warmup.cancel()
+        stop_render_service()
+        stop_export_queue()
+        super().quit()
+
     def toggle_file_menu(self):
         if self.file_menu_visible:
             self.file_menu_frame.place_forget()
@@ -253,11 +282,19 @@ class IconGridApp(tk.Tk):
             section_frame.grid(row=grid_r, column=grid_c, padx=10, pady=10, sticky="n")
 
             section_label = ttk.Label(section_frame, text=section, background=COLOR_BG, foreground=COLOR_FG)
-            section_label.grid(row=0, column=0, sticky="w", pady=(10, 0))
+            section_label.grid(row=0, column=0, columnspan=2, sticky="w", pady=(10, 0))
+
+            # All cells of a section live on one canvas; the picker buttons
+            # sit in fixed-height rows beside it
+            section_grid = SectionGrid(section_frame, section, GRID_ROWS, GRID_COLUMNS, bg=COLOR_BG,
+                                       on_change=self.cell_changed, on_click=self.select_cell)
+            section_grid.grid(row=1, column=1, rowspan=GRID_ROWS, sticky="nw", padx=5)
+            self.grid_cells[section].update(section_grid.cells)
 
             for row in range(GRID_ROWS):
-                control_frame = tk.Frame(section_frame, bg=COLOR_BG)
-                control_frame.grid(row=row + 1, column=0, sticky="w", padx=5, pady=2)
+                control_frame = tk.Frame(section_frame, bg=COLOR_BG, width=44, height=ROW_PITCH)
+                control_frame.grid_propagate(False)
+                control_frame.grid(row=row + 1, column=0, sticky="w", padx=5)
 
                 if section in ("Left Shoulder", "Right Shoulder"):
                     icon_btn = tk.Button(control_frame, text="🖼️", width=3, font=("Segoe UI Emoji", 10), bg="#333", fg="white", relief="flat")
@@ -276,13 +313,12 @@ class IconGridApp(tk.Tk):
                 color_btn.grid(row=2, column=0, sticky="w", pady=1)
                 Tooltip(color_btn, "Pick Color")
 
-                grid_frame = tk.Frame(control_frame, bg=COLOR_BG)
-                grid_frame.grid(row=0, column=1, rowspan=3, sticky="w", padx=5)
-
-                for col in range(GRID_COLUMNS):
-                    cell = IconCell(grid_frame, row, col)
-                    cell.grid(row=0, column=col, padx=1, pady=1)
-                    self.grid_cells[section][(row, col)] = cell
+    def select_cell(self, section, row, col):
+        if self.sel_cell:
+            self.sel_cell.unhighlight()
+        self.sel_cell = self.grid_cells[section].get((row, col))
+        if self.sel_cell:
+            self.sel_cell.highlight()
 
     def pick_font_for_row(self, section, row, Widget=None):
         dialog = FontPickerDialog(self, section, row)
@@ -346,11 +382,10 @@ class IconGridApp(tk.Tk):
                 if isinstance(cell.content, str):
                     cell.set_text(cell.content, font=cell.font, color=color)
                 elif cell.icon_path:
-                    tinted_img = get_cached_icon(cell.icon_path, size=(CELL_SIZE - 6, CELL_SIZE - 6), color=color)
-                    cell.set_icon(tinted_img, path=cell.icon_path, tint=color)
+                    cell.load_icon(cell.icon_path, tint=color)
 
     def pick_icon_for_row(self, section, row, widget=None):
-        dialog = IconPickerDialogV2(self, self.icon_entries)
+        dialog = IconPickerDialogV2(self, self.icon_entries, tag_index=self.tag_index)
         self.align_dialog(dialog, widget)
         self.wait_window(dialog)
 
@@ -363,10 +398,9 @@ class IconGridApp(tk.Tk):
 
         for r in rows:
             color = self.get_row_color(section, r) or COLOR_FG
-            img = get_cached_icon(selected_icon.file, size=(CELL_SIZE - 6, CELL_SIZE - 6), color=color)
             for c in range(GRID_COLUMNS):
                 cell = self.grid_cells[section][(r, c)]
-                cell.set_icon(img, path=selected_icon.file, tint=color)
+                cell.load_icon(selected_icon.file, tint=color)
 
     def align_dialog(self, dialog, widget: None):
         if widget:
@@ -390,38 +424,27 @@ class IconGridApp(tk.Tk):
         )
         if not filepath:
             return
-        layout = {}
-        for section, cells in self.grid_cells.items():
-            layout[section] = {}
-            for (row, col), cell in cells.items():
-                data = {}
-                if isinstance(cell.content, str):
-                    data["text"] = cell.content
-                    data["font"] = cell.font
-                    data["color"] = cell.canvas.itemcget("all", "fill") or COLOR_FG
-                elif cell.icon_path:
-                    data["icon_file"] = cell.icon_path
-                if data:
-                    layout[section][f"{row},{col}"] = data
-                json.dump(layout, filepath, indent=2)
+        self.layout_snapshot().save(filepath)
+
+    def layout_snapshot(self):
+        return Layout.from_grid_cells(self.grid_cells)
 
     def load_layout(self):
         filepath = filedialog.askopenfilename(filetypes=[("JSON", "*.json")])
         if not filepath:
             return
-        with open(filepath) as f:
-            layout = json.load(f)
-        for section, cells in layout.items():
-            for coord, data in cells.items():
-                row, col = map(int, coord.split(","))
-                icon_data = {"file": data["icon_file"]} if data.get("icon_file") else None
-                self.set_cell_content(
-                    section, row, col,
-                    icon=icon_data,
-                    text=data.get("text"),
-                    font_name=data.get("font"),
-                    color=data.get("color")
-                )
+        self.apply_layout(Layout.load(filepath))
+
+    def apply_layout(self, layout):
+        for section, cells in layout.sections.items():
+            for (row, col), data in cells.items():
+                cell = self.grid_cells.get(section, {}).get((row, col))
+                if cell is None:
+                    continue
+                if data.is_text:
+                    cell.set_text(data.content, font=data.font, color=data.tint)
+                elif data.icon_path:
+                    cell.load_icon(data.icon_path, tint=data.tint)
 
     def debug_icon_cell_data(self, grid_cells, sections):
         print("\n\033[95m" + "="*30 + " GRID CELLS DEBUG " + "="*30 + "\033[0m\n")
@@ -442,6 +465,26 @@ class IconGridApp(tk.Tk):
     def open_preview_window(self):
          open_preview_window(self)
 
+    def add_cell_listener(self, callback):
+        # callback({(section, row, col), ...}) once per idle cycle after edits
+        self._cell_listeners.append(callback)
+
+    def remove_cell_listener(self, callback):
+        if callback in self._cell_listeners:
+            self._cell_listeners.remove(callback)
+
+    def cell_changed(self, section, row, col):
+        # Row-wide edits touch many cells; listeners get them in one batch
+        self._dirty_cells.add((section, row, col))
+        if self._dirty_after is None:
+            self._dirty_after = self.after_idle(self._flush_cell_changes)
+
+    def _flush_cell_changes(self):
+        self._dirty_after = None
+        changed, self._dirty_cells = self._dirty_cells, set()
+        for callback in list(self._cell_listeners):
+            callback(changed)
+
 
 
 
@@ -512,8 +555,7 @@ Repository link pending. Contributions and feedback welcome!"""
     def set_cell_content(self, section, row, col, *, icon=None, text=None, font_name=None, color=None):
         cell = self.grid_cells[section][(row, col)]
         if icon:
-            img = get_cached_icon(icon['file'], size=(CELL_SIZE - 6, CELL_SIZE - 6), color=color or COLOR_FG)
-            cell.set_icon(img, path=icon['file'])
+            cell.load_icon(icon['file'], tint=color or COLOR_FG)
         elif text:
             font_tuple = (font_name, 10) if font_name else cell.font
             cell.set_text(text, font=font_tuple, color=color or COLOR_FG)
@@ -525,7 +567,6 @@ Repository link pending. Contributions and feedback welcome!"""
         # You may want to update this depending on IconCell logic
             cell["color"] = color
 
-# --- Icon Cell Widget ---
 class Tooltip:
     def __init__(self, widget, text):
         self.widget = widget
@@ -554,56 +595,6 @@ class Tooltip:
         self.tip_window = None
 
 
-class IconCell(tk.Frame):
-    def __init__(self, master, row, col):
-        super().__init__(master, width=CELL_SIZE, height=CELL_SIZE, bg="#181818", highlightbackground="#2a2a2a", highlightthickness=1)
-        self.grid_propagate(False)
-        self.row = row
-        self.col = col
-        self.content = None
-        self.icon_path = None
-        self.font = (FONT_DEFAULT, 10, "bold")
-        self.tint = COLOR_FG
-
-        self.canvas = tk.Canvas(self, width=CELL_SIZE-6, height=CELL_SIZE-6,
-                                highlightthickness=0, bg="#181818")
-        self.canvas.place(x=3, y=3)
-
-    def set_icon(self, image, path=None,  tint=COLOR_FG):
-        self.content = image
-        self.icon_path = path
-        self.tint = tint  # ← store tint color
-        self.canvas.delete("all")
-        self.canvas.create_image(
-            (CELL_SIZE - 6) // 2,
-            (CELL_SIZE - 6) // 2,
-            image=image,
-            anchor="center"
-        )
-        self.canvas.image = image
-        self.tint = tint
-
-    def set_text(self, text, font=None, color=COLOR_FG):
-        self.content = text
-        if font:
-            self.font = font
-        self.tint = color
-        self.canvas.delete("all")
-        self.canvas.create_text(
-            (CELL_SIZE - 6) // 2,
-            (CELL_SIZE - 6) // 2,
-            text=text,
-            font=self.font,
-            fill=color,
-            anchor="center"
-        )
-
-    def highlight(self, color="#1f6aa5"):
-        self.configure(bg=color)
-
-    def unhighlight(self):
-        self.configure(bg="#181818")
-          
 if __name__ == "__main__":
     app = IconGridApp()
     app.mainloop()
@@ -0,0 +1,170 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Renders many saved layouts in parallel worker processes.
+#   python -m batch_export orders/ -f full-a4 -o out/ -j 8
+#   python -m batch_export manifest.json -o out/
+# A manifest is a JSON list of layout paths or of objects
+# {"layout": path, "format": "a5", "output": "name.pdf"}. Each worker keeps
+# its recolor templates and svglib drawings warm across jobs, so icons shared
+# between orders are only converted once per worker.
+
+SUMMARY_NAME = "summary.json"
+
+
+class BatchJob:
+    def __init__(self, layout_path, fmt, output_path):
+        self.layout_path = layout_path
+        self.format = fmt
+        self.output_path = output_path
+
+
+def _init_worker():
+    # Pay the reportlab/svglib import and the fonts/ scan once per worker, not once per job
+    import pdf_export  # noqa: F401
+    from font_registry import font_files
+    font_files()
+
+
+def _run_job(layout_path, fmt, output_path, use_cache=True):
+    from layout_model import Layout
+    from pdf_export import EXPORT_FORMATS
+    from export_cache import export_format_cached
+
+    start = time.perf_counter()
+    try:
+        layout = Layout.load(layout_path)
+        if use_cache:
+            export_format_cached(fmt, layout, output_path)
+        else:
+            EXPORT_FORMATS[fmt](layout, output_path)
+        return {"ok": True, "seconds": time.perf_counter() - start,
+                "bytes": os.path.getsize(output_path), "pid": os.getpid()}
+    except Exception as e:
+        return {"ok": False, "seconds": time.perf_counter() - start,
+                "error": f"{type(e).__name__}: {e}", "pid": os.getpid()}
+
+
+def _output_name(layout_path, fmt, taken):
+    # Deterministic: same inputs always map to the same file name
+    stem = os.path.splitext(os.path.basename(layout_path))[0]
+    name = f"{stem}_{fmt}.pdf"
+    if _name_key(name) in taken:
+        digest = hashlib.sha1(os.path.abspath(layout_path).encode("utf-8")).hexdigest()[:8]
+        name = f"{stem}_{fmt}_{digest}.pdf"
+    taken.add(_name_key(name))
+    return name
+
+
+def _name_key(name):
+    # Two spellings of one file (a/../b.pdf, B.PDF on Windows) must collide
+    return os.path.normcase(os.path.normpath(name))
+
+
+def collect_jobs(source, fmt, output_dir):
+    if os.path.isdir(source):
+        entries = sorted(glob.glob(os.path.join(source, "*.json")))
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        base_dir = os.path.dirname(os.path.abspath(source))
+        entries = [
+            dict(e, layout=os.path.join(base_dir, e["layout"])) if isinstance(e, dict)
+            else os.path.join(base_dir, e)
+            for e in entries
+        ]
+
+    entries = [{"layout": e} if isinstance(e, str) else e for e in entries]
+    # Explicit outputs are claimed first so generated names steer around them
+    taken = set()
+    for entry in entries:
+        if entry.get("output"):
+            key = _name_key(entry["output"])
+            if key in taken:
+                raise ValueError(f"Output {entry['output']} is used by more than one manifest entry")
+            taken.add(key)
+
+    jobs = []
+    for entry in entries:
+        job_fmt = entry.get("format", fmt)
+        name = entry.get("output") or _output_name(entry["layout"], job_fmt, taken)
+        jobs.append(BatchJob(entry["layout"], job_fmt, os.path.join(output_dir, name)))
+    return jobs
+
+
+def run_batch(jobs, max_workers=None, on_result=None, use_cache=True):
+    results = [None] * len(jobs)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(_run_job, job.layout_path, job.format, job.output_path, use_cache): i
+            for i, job in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            job = jobs[i]
+            try:
+                result = future.result()
+            except Exception as e:  # worker died
+                result = {"ok": False, "seconds": 0.0, "error": f"{type(e).__name__}: {e}"}
+            result.update(layout=job.layout_path, format=job.format, output=job.output_path)
+            results[i] = result
+            if on_result:
+                on_result(result)
+
+    failed = [r for r in results if not r["ok"]]
+    return {
+        "jobs": len(jobs),
+        "succeeded": len(jobs) - len(failed),
+        "failed": len(failed),
+        "wall_seconds": time.perf_counter() - start,
+        "job_seconds": sum(r["seconds"] for r in results),
+        "results": results,
+    }
+
+
+def main(argv=None):
+    from pdf_export import EXPORT_FORMATS
+
+    parser = argparse.ArgumentParser(prog="python -m batch_export", description="Render many layouts to PDF in parallel")
+    parser.add_argument("source", help="directory of layout JSON files, or a manifest JSON")
+    parser.add_argument("-f", "--format", choices=sorted(EXPORT_FORMATS), default="a5",
+                        help="format for jobs that do not set one")
+    parser.add_argument("-o", "--output-dir", default="exports")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="always re-render instead of reusing cache/exports/")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = collect_jobs(args.source, args.format, args.output_dir)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    if not jobs:
+        print(f"[WARN] No layouts found in {args.source}")
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    def report(result):
+        status = "ok  " if result["ok"] else "FAIL"
+        detail = os.path.basename(result["output"]) if result["ok"] else result["error"]
+        print(f"[{status}] {result['seconds']:7.2f}s  {result['layout']} -> {detail}")
+
+    summary = run_batch(jobs, args.jobs, on_result=report, use_cache=not args.no_cache)
+    summary_path = os.path.join(args.output_dir, SUMMARY_NAME)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"{summary['succeeded']}/{summary['jobs']} exported in {summary['wall_seconds']:.2f}s "
+          f"({summary['job_seconds']:.2f}s of work), summary in {summary_path}")
+    return 0 if not summary["failed"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
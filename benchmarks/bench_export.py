@@ -0,0 +1,269 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from layout_model import Layout, CellData, SECTIONS, ICON_SECTIONS, GRID_ROWS, GRID_COLUMNS
+
+# Times the export and preview pipelines on synthetic layouts. Each
+# (layout, target) case runs in a fresh process, so "cold" includes SVG
+# parsing and font loading and "warm" is a repeat in the same process.
+# Run from the repository root:
+#   python -m benchmarks.bench_export                   # compare with the baseline
+#   python -m benchmarks.bench_export --save            # record a new baseline
+#   python -m benchmarks.bench_export --layouts distinct --targets pdf-full-a4 --fill 0.25 1
+# Targets whose dependencies are missing (no display for Tk, no cairo for
+# rasters) are reported as skipped rather than failing the run.
+
+BASELINE_PATH = os.path.join("benchmarks", "baselines", "bench_export.json")
+REGRESSION_THRESHOLD = 1.20  # warm time or peak memory 20% over baseline
+TINTS = ["#C0C0C0", "#B22222", "#FFD700", "#1E90FF", "#FFFFFF"]
+FONTS = [("Caliban Angelus", 10), ("Caslon Antique", 10), ("Arial", 10, "bold")]
+TEXT = "I II III IV V VI VII VIII IX X".split()
+
+
+def _icons(icon_folder):
+    # Largest first, so "heavy" picks the most complex SVGs
+    return sorted(glob.glob(os.path.join(icon_folder, "*.svg")), key=os.path.getsize, reverse=True)
+
+
+def _cells(fill):
+    # Row-major order, so a partial fill looks like a partially edited sheet
+    count = round(GRID_ROWS * GRID_COLUMNS * fill)
+    return [(r, c) for r in range(GRID_ROWS) for c in range(GRID_COLUMNS)][:count]
+
+
+def build_layout(kind, fill=1.0, icon_folder="icons"):
+    icons = _icons(icon_folder)
+    if kind == "same":
+        pick = lambda i: icons[len(icons) // 2]
+    elif kind == "distinct":
+        pick = lambda i: icons[i % len(icons)]
+    elif kind == "heavy":
+        pick = lambda i: icons[i % 10]
+    else:
+        pick = None
+
+    layout = Layout()
+    i = 0
+    for section in SECTIONS:
+        text_section = kind == "text" or section not in ICON_SECTIONS
+        for r, c in _cells(fill):
+            tint = TINTS[r % len(TINTS)]
+            if text_section:
+                cell = CellData(text=TEXT[c % len(TEXT)], font=FONTS[r % len(FONTS)], tint=tint)
+            else:
+                cell = CellData(icon_path=pick(i), tint=tint)
+                i += 1
+            layout.set_cell(section, r, c, cell)
+    return layout
+
+
+LAYOUTS = {
+    "same": "one icon in every icon cell",
+    "distinct": "a different icon in every icon cell",
+    "heavy": "the 10 largest SVGs in icons/, cycled",
+    "text": "text in all four sections",
+}
+
+
+def layout_stats(layout):
+    paths = layout.icon_paths()
+    return {"icons": len(paths), "svg_kb": round(sum(os.path.getsize(p) for p in paths) / 1024)}
+
+
+def _pdf_target(fmt):
+    def run(layout, out_dir):
+        from pdf_export import EXPORT_FORMATS
+        path = os.path.join(out_dir, f"{fmt}.pdf")
+        EXPORT_FORMATS[fmt](layout, path)
+        return path
+    return run
+
+
+def _raster_target(dpi):
+    def run(layout, out_dir):
+        from raster_export import export_raster
+        return export_raster(layout, os.path.join(out_dir, f"sheet_{dpi}.png"), "full-a4", dpi)
+    return run
+
+
+def _preview_target(layout, out_dir):
+    # open_preview_window builds the whole preview canvas synchronously; it
+    # only needs a Tk parent that carries grid_cells
+    import tkinter as tk
+    from preview_window import open_preview_window
+
+    root = _preview_target.root
+    if root is None:
+        root = _preview_target.root = tk.Tk()
+        root.withdraw()
+    root.grid_cells = layout.sections  # CellData mirrors the GridCell attributes
+    before = set(root.winfo_children())
+    open_preview_window(root)
+    root.update_idletasks()
+    for child in set(root.winfo_children()) - before:
+        child.destroy()
+    return None
+
+
+_preview_target.root = None
+
+TARGETS = {
+    "pdf-half-a4": _pdf_target("half-a4"),
+    "pdf-full-a4": _pdf_target("full-a4"),
+    "pdf-a5": _pdf_target("a5"),
+    "png-300": _raster_target(300),
+    "preview": _preview_target,
+}
+
+
+def _peak_rss_mb():
+    # Peak resident set of this process, or None where it can't be read
+    if sys.platform == "win32":
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 2 ** 20
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB on Linux and the BSDs
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(kind, fill, target, repeat, icon_folder, queue):
+    try:
+        layout = build_layout(kind, fill, icon_folder)
+        run = TARGETS[target]
+        with tempfile.TemporaryDirectory() as out_dir:
+            start = time.perf_counter()
+            path = run(layout, out_dir)
+            cold = time.perf_counter() - start
+            size = os.path.getsize(path) if path else None
+
+            warm = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run(layout, out_dir)
+                warm.append(time.perf_counter() - start)
+
+            tracemalloc.start()
+            run(layout, out_dir)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        queue.put({
+            "cold_s": cold,
+            "warm_s": statistics.median(warm) if warm else cold,
+            "peak_mb": peak / 2 ** 20,
+            "rss_mb": _peak_rss_mb(),
+            "bytes": size,
+        })
+    except Exception as e:
+        reason = str(e).splitlines()[0] if str(e) else ""
+        queue.put({"skipped": f"{type(e).__name__}: {reason}"})
+
+
+def run_case(kind, fill, target, repeat=3, icon_folder="icons"):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(kind, fill, target, repeat, icon_folder, queue))
+    proc.start()
+    proc.join()
+    if queue.empty():
+        return {"skipped": f"worker exited with code {proc.exitcode}"}
+    return queue.get()
+
+
+def _machine():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(), "cpus": os.cpu_count()}
+
+
+def _load_baseline(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _compare(result, base):
+    # Returns a short note and whether it counts as a regression
+    if not base or "skipped" in base or "skipped" in result:
+        return "", False
+    notes = []
+    regressed = False
+    for key in ("warm_s", "peak_mb"):
+        if base[key]:
+            ratio = result[key] / base[key]
+            notes.append(f"{key.split('_')[0]} {ratio:5.2f}x")
+            regressed |= ratio > REGRESSION_THRESHOLD
+    return "  ".join(notes), regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF, raster and preview export")
+    parser.add_argument("--layouts", nargs="+", choices=sorted(LAYOUTS), default=sorted(LAYOUTS))
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--fill", nargs="+", type=float, default=[1.0], help="fraction of each grid filled")
+    parser.add_argument("--repeat", type=int, default=3, help="warm runs per case")
+    parser.add_argument("--icons", default="icons")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    baseline = _load_baseline(args.baseline)
+    base_cases = (baseline or {}).get("cases", {})
+    if baseline and baseline.get("machine") != _machine():
+        print(f"[WARN] Baseline {args.baseline} was recorded on a different machine")
+
+    cases = {}
+    regressions = []
+    print(f"{'case':36} {'cold s':>8} {'warm s':>8} {'peak MB':>8} {'rss MB':>8} {'bytes':>10}")
+    for kind in args.layouts:
+        for fill in args.fill:
+            stats = layout_stats(build_layout(kind, fill, args.icons))
+            print(f"{kind} ({LAYOUTS[kind]}), fill {fill:g}: {stats['icons']} distinct icons, {stats['svg_kb']} KiB of SVG")
+            for target in args.targets:
+                name = f"{kind}/{fill:g}/{target}"
+                result = cases[name] = dict(run_case(kind, fill, target, args.repeat, args.icons), **stats)
+                if "skipped" in result:
+                    print(f"{name:36} skipped ({result['skipped']})")
+                    continue
+                note, regressed = _compare(result, base_cases.get(name))
+                if regressed:
+                    regressions.append(name)
+                size = result["bytes"] if result["bytes"] is not None else "-"
+                rss = f"{result['rss_mb']:8.0f}" if result.get("rss_mb") is not None else f"{'-':>8}"
+                print(f"{name:36} {result['cold_s']:8.3f} {result['warm_s']:8.3f} {result['peak_mb']:8.1f} "
+                      f"{rss} {size:>10}  {note}{'  REGRESSION' if regressed else ''}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        merged = dict(base_cases)
+        merged.update(cases)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": _machine(), "recorded": time.strftime("%Y-%m-%d"), "cases": merged},
+                      f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} case(s) slower or larger than baseline by more than "
+              f"{(REGRESSION_THRESHOLD - 1) * 100:.0f}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
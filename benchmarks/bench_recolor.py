@@ -0,0 +1,68 @@
+import argparse
+import glob
+import os
+import time
+from bs4 import BeautifulSoup
+import svg_recolor
+
+# Compares the template recolor engine with the BeautifulSoup implementation
+# it replaced. Run from the repository root:
+#   python -m benchmarks.bench_recolor [--colors 8] [--largest 20]
+
+
+def tint_svg_soup(svg_path, color_hex):
+    # The pre-template export_helpers.tint_svg, kept verbatim as the baseline
+    with open(svg_path, "r", encoding="utf-8") as f:
+        svg_data = f.read()
+
+    soup = BeautifulSoup(svg_data, "xml")
+
+    for tag in soup.find_all(["path", "circle", "rect", "polygon", "ellipse", "line", "polyline", "g"]):
+        if "style" in tag.attrs:
+            del tag["style"]
+        if "fill" not in tag.attrs or tag["fill"] in ("none", "currentColor", "inherit", "", None):
+            tag["fill"] = color_hex
+        else:
+            tag["fill"] = color_hex
+
+    return str(soup)
+
+
+def _time(fn, paths, colors):
+    start = time.perf_counter()
+    for path in paths:
+        for color in colors:
+            fn(path, color)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SVG recoloring")
+    parser.add_argument("--icons", default="icons")
+    parser.add_argument("--colors", type=int, default=8, help="distinct tints per icon")
+    parser.add_argument("--largest", type=int, default=20, help="only the N largest SVGs (0 = all)")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.icons, "*.svg")), key=os.path.getsize, reverse=True)
+    if args.largest:
+        paths = paths[:args.largest]
+    colors = [f"#{(i * 0x1F3D5B) & 0xFFFFFF:06X}" for i in range(args.colors)]
+    total_kb = sum(os.path.getsize(p) for p in paths) / 1024
+
+    print(f"{len(paths)} SVGs ({total_kb:.0f} KiB), {len(colors)} tints each")
+    soup = _time(tint_svg_soup, paths, colors)
+    print(f"  BeautifulSoup          {soup:8.3f}s")
+
+    svg_recolor.clear_caches()
+    cold = _time(svg_recolor.tint_svg, paths, colors)
+    print(f"  template (cold)        {cold:8.3f}s  {soup / cold:6.1f}x")
+    warm = _time(svg_recolor.tint_svg, paths, colors)
+    print(f"  template (memoized)    {warm:8.3f}s  {soup / max(warm, 1e-9):6.1f}x")
+
+    svg_recolor._tinted.cache_clear()
+    fresh = _time(svg_recolor.tint_svg, paths, [c.lower() for c in colors])
+    print(f"  template (new tints)   {fresh:8.3f}s  {soup / fresh:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
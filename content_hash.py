@@ -0,0 +1,34 @@
+import hashlib
+import os
+
+# (path) -> (stat signature, digest); re-hashed only when size or mtime changes
+_HASH_MEMO = {}
+
+
+def _stat_signature(path):
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns)
+
+
+def file_hash(path):
+    signature = _stat_signature(path)
+    memo = _HASH_MEMO.get(path)
+    if memo and memo[0] == signature:
+        return memo[1]
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    _HASH_MEMO[path] = (signature, digest)
+    return digest
+
+
+def stat_signature(path):
+    return _stat_signature(path)
+
+
+def remember_hash(path, signature, digest):
+    _HASH_MEMO[path] = (signature, digest)
+
+
+def bytes_hash(data):
+    return hashlib.sha1(data).hexdigest()
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from content_hash import file_hash
+from font_registry import font_file_for
+from layout_model import SECTIONS
+from pdf_export import EXPORT_FORMATS
+
+# On-disk cache of finished exports. The key is a stable hash of everything
+# that affects the output: the cells of each section (icons by content hash,
+# fonts by file hash, tints, text) plus the export settings. Exporting an
+# unchanged sheet again copies the cached file instead of re-rendering.
+# Raster exports also keep each section's rendered band in SECTION_CACHE
+# under its section_key, so editing one section re-renders only that band.
+# PDFs are cached whole: reportlab can't carry content between documents.
+CACHE_DIR = os.path.join("cache", "exports")
+CACHE_BUDGET = 512 * 1024 * 1024
+SECTION_CACHE_DIR = os.path.join("cache", "sections")
+SECTION_CACHE_BUDGET = 1024 * 1024 * 1024
+CACHE_VERSION = 1  # bump when the renderers change so old files are ignored
+
+_lock = threading.Lock()
+
+
+def _font_key(font):
+    # Family plus the hash of the file it resolves to; built-ins by name only
+    family = font[0] if font else None
+    path = font_file_for(family)
+    return [list(font or ()), file_hash(path) if path else None]
+
+
+def _cell_key(cell):
+    if cell.is_text:
+        return {"text": cell.content, "font": _font_key(cell.font), "color": cell.tint}
+    if cell.icon_path:
+        try:
+            icon = file_hash(cell.icon_path)
+        except OSError:
+            icon = f"missing:{cell.icon_path}"
+        return {"icon": icon, "color": cell.tint}
+    return None
+
+
+def section_key(layout, section):
+    cells = {}
+    for (row, col), cell in layout[section].items():
+        key = _cell_key(cell)
+        if key is not None:
+            cells[f"{row},{col}"] = key
+    data = json.dumps(cells, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def layout_key(layout, settings=None):
+    # Built from the section keys, so it changes whenever any section does
+    data = json.dumps({
+        "version": CACHE_VERSION,
+        "sections": [section_key(layout, section) for section in SECTIONS],
+        "settings": settings or {},
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+class ExportCache:
+    # Least recently used files are dropped once the folder exceeds the budget
+    def __init__(self, cache_dir=CACHE_DIR, budget_bytes=CACHE_BUDGET):
+        self.cache_dir = cache_dir
+        self.budget_bytes = budget_bytes
+
+    def path_for(self, key, ext):
+        return os.path.join(self.cache_dir, f"{key}{ext}")
+
+    def tmp_path(self, key, ext):
+        # Unique per writer, so processes and threads never share a partial file
+        return f"{self.path_for(key, ext)}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    def get(self, key, ext):
+        path = self.path_for(key, ext)
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        return path
+
+    def put(self, key, ext, source_path, move=False):
+        # move=True adopts a file written to tmp_path() instead of copying it
+        path = self.path_for(key, ext)
+        tmp_path = source_path if move else self.tmp_path(key, ext)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if not move:
+                shutil.copyfile(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARN] Could not store export in cache: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return None
+        self.evict()
+        return path
+
+    def evict(self):
+        with _lock:
+            try:
+                entries = [(e.stat().st_mtime_ns, e.stat().st_size, e.path)
+                           for e in os.scandir(self.cache_dir)
+                           if e.is_file() and not e.name.endswith(".tmp")]
+            except OSError:
+                return
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.budget_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+EXPORT_CACHE = ExportCache()
+SECTION_CACHE = ExportCache(SECTION_CACHE_DIR, SECTION_CACHE_BUDGET)
+
+
+def cached_export(export_fn, layout, path, settings, progress=None, cache=None):
+    # export_fn(layout, path, progress=...) only runs on a cache miss
+    cache = cache or EXPORT_CACHE
+    ext = os.path.splitext(path)[1].lower()
+    key = layout_key(layout, settings)
+    hit = cache.get(key, ext)
+    if hit:
+        try:
+            shutil.copyfile(hit, path)
+            if progress:
+                progress(1, 1)
+            return path
+        except OSError as e:
+            print(f"[WARN] Could not reuse cached export {hit}: {e}")
+
+    export_fn(layout, path, progress=progress)
+    cache.put(key, ext, path)
+    return path
+
+
+def export_format_cached(fmt, layout, path, progress=None):
+    # Cached counterpart of EXPORT_FORMATS[fmt](layout, path, progress)
+    return cached_export(EXPORT_FORMATS[fmt], layout, path, {"format": fmt}, progress)
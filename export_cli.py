@@ -0,0 +1,74 @@
+import argparse
+import os
+import sys
+from layout_model import Layout
+from functools import partial
+from pdf_export import EXPORT_FORMATS, PAGE_SIZES, export_imposed_pdf
+from export_cache import cached_export, SECTION_CACHE
+
+# Headless exporter: renders a saved layout JSON straight to PDF, no display needed.
+#   python -m export_cli layout.json --format full-a4 -o sheet.pdf
+#   python -m export_cli layout.json --page a3 --n-up 4
+#   python -m export_cli layout.json -f full-a4 -o sheet.png --dpi 1200
+
+
+def default_output(layout_path, fmt):
+    base = os.path.splitext(os.path.basename(layout_path))[0]
+    return f"{base}_{fmt}.pdf"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m export_cli", description="Render a saved decal layout to PDF")
+    parser.add_argument("layout", help="layout JSON saved from the app")
+    parser.add_argument("-f", "--format", choices=sorted(EXPORT_FORMATS), default="a5")
+    parser.add_argument("-o", "--output", help="output path (default: <layout>_<format>.pdf); "
+                                                   ".png/.tif/.tiff exports a raster image")
+    parser.add_argument("--page", choices=sorted(PAGE_SIZES), help="impose several half-sheets on this page size")
+    parser.add_argument("--n-up", type=int, help="half-sheets per page with --page (default: 2)")
+    parser.add_argument("--dpi", type=int, default=300, help="raster export resolution (default: 300)")
+    parser.add_argument("--transparent", action="store_true", help="raster export with a transparent background")
+    parser.add_argument("--no-cache", action="store_true", help="always re-render instead of reusing cache/exports/ and cache/sections/")
+    args = parser.parse_args(argv)
+    raster = bool(args.output) and os.path.splitext(args.output)[1].lower() in (".png", ".tif", ".tiff")
+    if raster and (args.page or args.n_up):
+        parser.error("--page/--n-up impose PDF pages; raster output takes -f a5, half-a4 or full-a4")
+    if args.n_up and not args.page:
+        parser.error("--n-up needs --page")
+    n_up = args.n_up or 2
+
+    try:
+        layout = Layout.load(args.layout)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] Could not read layout {args.layout}: {e}", file=sys.stderr)
+        return 1
+
+    if raster:
+        from raster_export import export_raster
+        output = args.output
+        # Unchanged sections reuse their rendered bands from cache/sections/
+        export_fn = partial(export_raster, page=args.format, dpi=args.dpi, transparent=args.transparent,
+                            section_cache=None if args.no_cache else SECTION_CACHE)
+        settings = {"raster": args.format, "dpi": args.dpi, "transparent": args.transparent}
+    elif args.page:
+        output = args.output or default_output(args.layout, f"{args.page}-{n_up}up")
+        export_fn = partial(export_imposed_pdf, page=args.page, n_up=n_up)
+        settings = {"page": args.page, "n_up": n_up}
+    else:
+        output = args.output or default_output(args.layout, args.format)
+        export_fn = EXPORT_FORMATS[args.format]
+        settings = {"format": args.format}
+
+    try:
+        if args.no_cache:
+            export_fn(layout, output)
+        else:
+            cached_export(export_fn, layout, output, settings)
+    except ValueError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 1
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
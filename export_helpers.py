@@ -1,26 +1,17 @@
 import os
 from io import BytesIO
-from bs4 import BeautifulSoup
 from svglib.svglib import svg2rlg
 from reportlab.graphics import renderPDF
 from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfdoc
 import subprocess
+from functools import lru_cache
+from content_hash import file_hash, bytes_hash
+import svg_recolor
 
 def tint_svg(svg_path, color_hex):
-    with open(svg_path, "r", encoding="utf-8") as f:
-        svg_data = f.read()
-
-    soup = BeautifulSoup(svg_data, "xml")
-
-    for tag in soup.find_all(["path", "circle", "rect", "polygon", "ellipse", "line", "polyline", "g"]):
-        if "style" in tag.attrs:
-            del tag["style"]
-        if "fill" not in tag.attrs or tag["fill"] in ("none", "currentColor", "inherit", "", None):
-            tag["fill"] = color_hex
-        else:
-            tag["fill"] = color_hex
-
-    return str(soup)
+    # Parsed once per file into a recolor template, memoized per (hash, color)
+    return svg_recolor.tint_svg(svg_path, color_hex)
 
 def draw_svg_to_pdf(canvas, svg_string, x, y, width, height):
     svg_io = BytesIO(svg_string.encode("utf-8"))
@@ -34,6 +25,62 @@ def draw_svg_to_pdf(canvas, svg_string, x, y, width, height):
 
     renderPDF.draw(drawing, canvas, x, y)
 
+DRAWING_CACHE_SIZE = 256
+
+@lru_cache(maxsize=DRAWING_CACHE_SIZE)
+def _icon_drawing(digest, svg_path, color_hex):
+    return svg2rlg(BytesIO(tint_svg(svg_path, color_hex).encode("utf-8")))
+
+def icon_drawing(svg_path, color_hex):
+    # svglib conversion is the expensive step; keep the result per process
+    # so every document (and every batch job in a worker) reuses it
+    return _icon_drawing(file_hash(svg_path), svg_path, color_hex)
+
+def icon_form(canvas, svg_path, color_hex, width, height):
+    # Each (icon, tint, size) is drawn once per document as a Form XObject;
+    # every cell that uses it only places a reference to it.
+    forms = getattr(canvas, "_icon_forms", None)
+    if forms is None:
+        forms = canvas._icon_forms = {}
+    key = (file_hash(svg_path), color_hex, width, height)
+    name = forms.get(key)
+    if name is None:
+        name = "icon_" + bytes_hash(repr(key).encode("utf-8"))[:16]
+        canvas.beginForm(name, lowerx=0, lowery=0, upperx=width, uppery=height)
+        drawing = icon_drawing(svg_path, color_hex)
+        if drawing is not None and drawing.width and drawing.height:
+            scale = min(width / drawing.width, height / drawing.height)
+            canvas.saveState()
+            canvas.scale(scale, scale)
+            renderPDF.draw(drawing, canvas, 0, 0)
+            canvas.restoreState()
+        canvas.endForm()
+        attach_form_resources(canvas, name)
+        forms[key] = name
+    return name
+
+def attach_form_resources(canvas, name):
+    # reportlab only writes fonts and XObjects into a form's resources; svglib
+    # opacity becomes ExtGState entries, which the form must carry itself
+    form = canvas._doc.idToObject[pdfdoc.xObjectName(name)]
+    extgstate = getattr(form, "ExtGState", None)
+    if not extgstate:
+        return
+    resources = pdfdoc.PDFResourceDictionary()
+    resources.basicFonts()
+    resources.allProcs()
+    if form.XObjects:
+        resources.XObject = form.XObjects
+    resources.ExtGState = extgstate
+    form.Resources = resources
+
+def draw_icon_form(canvas, svg_path, color_hex, x, y, width, height):
+    name = icon_form(canvas, svg_path, color_hex, width, height)
+    canvas.saveState()
+    canvas.translate(x, y)
+    canvas.doForm(name)
+    canvas.restoreState()
+
 def trigger_pdf_print_dialog(path):
     try:
         os.startfile(path, "print")  # Windows only
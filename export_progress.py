@@ -0,0 +1,74 @@
+import tkinter as tk
+from tkinter import ttk
+from export_queue import RUNNING, DONE, FAILED, CANCELLED
+
+# Toolbar strip showing the export that is rendering, how many are queued
+# behind it, a progress bar and a cancel button. Hidden while idle.
+
+BG = "#111111"
+FG = "#888888"
+RESULT_MS = 4000  # how long the outcome stays visible
+RESULT_TEXT = {DONE: "ready", FAILED: "failed", CANCELLED: "cancelled"}
+
+
+class ExportProgressBar(tk.Frame):
+    def __init__(self, parent, export_queue, font=None, **kwargs):
+        super().__init__(parent, bg=BG, **kwargs)
+        self.export_queue = export_queue
+        self._current = None
+        self._hide_after = None
+
+        self.label = tk.Label(self, text="", bg=BG, fg=FG, font=font)
+        self.label.pack(side="left", padx=(0, 6))
+        self.bar = ttk.Progressbar(self, length=140, mode="determinate", maximum=1.0)
+        self.bar.pack(side="left")
+        self.cancel_button = tk.Button(self, text="✕", bg="#333", fg="white", relief="flat",
+                                       padx=4, pady=0, command=self.cancel_current)
+        self.cancel_button.pack(side="left", padx=(4, 0))
+
+        export_queue.add_listener(self.update_jobs)
+
+    def cancel_current(self):
+        if self._current is not None:
+            self.export_queue.cancel(self._current)
+
+    def update_jobs(self, jobs):
+        active = [job for job in jobs if not job.finished and not job.cancelled]
+        previous = self._current
+        if not active:
+            self._current = None
+            if previous is not None:
+                self._show_result(previous)
+            return
+        if self._hide_after:
+            self.after_cancel(self._hide_after)
+            self._hide_after = None
+
+        job = self._current = next((j for j in active if j.state == RUNNING), active[0])
+        queued = len(active) - 1
+        text = f"Exporting {job.label}" + (f" (+{queued} queued)" if queued else "")
+        self.label.config(text=text)
+        self.bar.config(value=job.progress)
+        self.cancel_button.config(state="normal")
+        if not self.winfo_manager():
+            self.pack(side="right", padx=10)
+
+    def _show_result(self, job):
+        state = CANCELLED if job.cancelled and job.state != DONE else job.state
+        self.label.config(text=f"{job.label} {RESULT_TEXT.get(state, state)}")
+        self.bar.config(value=job.progress if state == DONE else 0)
+        self.cancel_button.config(state="disabled")
+        if self._hide_after:
+            self.after_cancel(self._hide_after)
+        self._hide_after = self.after(RESULT_MS, self._hide)
+
+    def _hide(self):
+        self._hide_after = None
+        if self._current is None:
+            self.pack_forget()
+
+    def destroy(self):
+        self.export_queue.remove_listener(self.update_jobs)
+        if self._hide_after:
+            self.after_cancel(self._hide_after)
+        super().destroy()
@@ -0,0 +1,192 @@
+import os
+import queue
+import threading
+
+# Runs PDF exports one at a time on a background thread so the Tk windows stay
+# responsive. Jobs carry a Layout snapshot, never live grid cells, so editing
+# can continue while a sheet renders. Progress and completion are delivered
+# on the Tk thread through an after() pump, like render_service.
+
+POLL_MS = 50
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportJob:
+    def __init__(self, label, export_fn, layout, path, on_done=None):
+        self.label = label
+        self.export_fn = export_fn
+        self.layout = layout
+        self.path = path
+        self.on_done = on_done
+        self.state = QUEUED
+        self.progress = 0.0
+        self.error = None
+        self.cancelled = False
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _report(self, done, total):
+        # Called from the export loop after every cell
+        if self.cancelled:
+            raise ExportCancelled()
+        self.progress = done / total if total else 1.0
+
+
+class ExportQueue:
+    def __init__(self, root):
+        self.root = root
+        self._jobs = queue.Queue()
+        self._finished = queue.Queue()
+        self._pending = []  # submitted, not yet reported finished; [0] is usually running
+        self._listeners = []
+        self._stopped = False
+        self._after_id = None
+        self._worker = threading.Thread(target=self._work, daemon=True, name="pdf-export")
+        self._worker.start()
+
+    def submit(self, label, export_fn, layout, path, on_done=None):
+        job = ExportJob(label, export_fn, layout, path, on_done)
+        self._pending.append(job)
+        self._jobs.put(job)
+        self._notify()
+        self._ensure_pump()
+        return job
+
+    def cancel(self, job):
+        job.cancel()
+        self._notify()
+
+    def cancel_all(self):
+        for job in self._pending:
+            job.cancel()
+        self._notify()
+
+    @property
+    def jobs(self):
+        return list(self._pending)
+
+    def add_listener(self, callback):
+        # callback(jobs) on the Tk thread whenever progress or the queue changes
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def stop(self):
+        self._stopped = True
+        self.cancel_all()
+        self._jobs.put(None)
+        if self._after_id:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None or self._stopped:
+                return
+            if job.cancelled:
+                job.state = CANCELLED
+            else:
+                job.state = RUNNING
+                try:
+                    job.export_fn(job.layout, job.path, progress=job._report)
+                    job.progress = 1.0
+                    job.state = DONE
+                except ExportCancelled:
+                    job.state = CANCELLED
+                except Exception as e:
+                    job.error = e
+                    job.state = FAILED
+                if job.state != DONE:
+                    try:
+                        os.remove(job.path)
+                    except OSError:
+                        pass
+            self._finished.put(job)
+
+    def _ensure_pump(self):
+        if self._after_id is None and not self._stopped:
+            self._after_id = self.root.after(POLL_MS, self._pump)
+
+    def _pump(self):
+        self._after_id = None
+        while True:
+            try:
+                job = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            if job in self._pending:
+                self._pending.remove(job)
+            if job.state == FAILED:
+                print(f"[ERROR] Export '{job.label}' failed: {job.error}")
+            if job.on_done:
+                try:
+                    job.on_done(job)
+                except Exception as e:
+                    print(f"[ERROR] Export callback failed: {e}")
+        self._notify()
+        if self._pending:
+            self._ensure_pump()
+
+    def _notify(self):
+        jobs = self.jobs
+        for callback in list(self._listeners):
+            callback(jobs)
+
+
+_queue = None
+
+
+def start_export_queue(root):
+    global _queue
+    if _queue is None:
+        _queue = ExportQueue(root)
+    return _queue
+
+
+def stop_export_queue():
+    global _queue
+    if _queue is not None:
+        _queue.stop()
+        _queue = None
+
+
+def get_export_queue():
+    return _queue
+
+
+def submit_export(label, export_fn, layout, path, on_done=None):
+    # Without a running queue (legacy app, tools) export synchronously
+    if _queue is not None:
+        return _queue.submit(label, export_fn, layout, path, on_done)
+    job = ExportJob(label, export_fn, layout, path, on_done)
+    try:
+        export_fn(layout, path)
+        job.progress = 1.0
+        job.state = DONE
+    except Exception as e:
+        job.error = e
+        job.state = FAILED
+        print(f"[ERROR] Export '{label}' failed: {e}")
+    if on_done:
+        on_done(job)
+    return job
@@ -0,0 +1,96 @@
+import os
+import threading
+from functools import lru_cache
+from PIL import ImageFont
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# Maps the family names the UI stores on text cells (from PIL's getname(),
+# see IconGridApp.pick_font_for_row) and font file stems to TTF files in
+# fonts/. The folder is scanned once and every face is registered with
+# reportlab at most once per process; after that resolving a cell's font is
+# a dict lookup.
+FONT_DIR = "fonts"
+FALLBACK_FONT = "Helvetica"
+FONT_EXTENSIONS = (".ttf", ".otf")
+FALLBACK_FONT_FILE = os.path.join(FONT_DIR, "Arial.ttf")  # metric match for Helvetica
+
+_lock = threading.Lock()
+_font_files = None  # lowercase family or file stem -> path
+_resolved = {}  # requested name -> reportlab font name
+
+
+def _scan_fonts(font_dir):
+    files = {}
+    try:
+        entries = sorted(os.scandir(font_dir), key=lambda e: e.name)
+    except OSError:
+        return files
+    for entry in entries:
+        if not entry.name.lower().endswith(FONT_EXTENSIONS):
+            continue
+        files.setdefault(os.path.splitext(entry.name)[0].lower(), entry.path)
+        try:
+            family = ImageFont.truetype(entry.path, size=12).getname()[0]
+        except OSError as e:
+            print(f"[WARN] Could not read font {entry.path}: {e}")
+            continue
+        files.setdefault(family.lower(), entry.path)
+    return files
+
+
+def font_files():
+    global _font_files
+    if _font_files is None:
+        with _lock:
+            if _font_files is None:
+                _font_files = _scan_fonts(FONT_DIR)
+    return _font_files
+
+
+def register_font(font_name, ttf_path):
+    # Returns the name to pass to setFont, or the fallback if it cannot load
+    with _lock:
+        if font_name in pdfmetrics.getRegisteredFontNames():
+            return font_name
+        try:
+            pdfmetrics.registerFont(TTFont(font_name, ttf_path))
+            return font_name
+        except Exception as e:
+            print(f"[WARN] Could not register font {font_name} ({ttf_path}): {e}")
+            return FALLBACK_FONT
+
+
+def _resolve(family):
+    if family in pdfmetrics.standardFonts:
+        return family
+    path = font_files().get(family.lower())
+    if path is None:
+        print(f"[WARN] Font {family!r} not found in {FONT_DIR}/, using {FALLBACK_FONT}")
+        return FALLBACK_FONT
+    return register_font(family, path)
+
+
+def resolve_pdf_font(family):
+    if not family:
+        return FALLBACK_FONT
+    name = _resolved.get(family)
+    if name is None:
+        name = _resolved[family] = _resolve(family)
+    return name
+
+
+def font_file_for(family):
+    return font_files().get((family or "").lower())
+
+
+@lru_cache(maxsize=64)
+def pil_font(family, size_px):
+    # Pillow font for raster output; falls back the same way the PDF does
+    for path in (font_file_for(family), FALLBACK_FONT_FILE):
+        if path and os.path.isfile(path):
+            try:
+                return ImageFont.truetype(path, size_px)
+            except OSError as e:
+                print(f"[WARN] Could not load font {path}: {e}")
+    return ImageFont.load_default(size=size_px)
@@ -0,0 +1,134 @@
+import json
+import mmap
+import os
+import threading
+from PIL import Image
+
+# Prebuilt sprite atlas of the library at the standard UI sizes.
+# Every size is a vertical strip of equally sized RGBA slots stored back to
+# back in one raw file, so a slot is a single contiguous range of the
+# memory-mapped buffer and only the pages of icons actually shown get read.
+ATLAS_DIR = os.path.join("cache", "atlas")
+INDEX_PATH = os.path.join(ATLAS_DIR, "index.json")
+ATLAS_SIZES = [(40, 40), (54, 54)]
+
+_lock = threading.Lock()
+_atlas = None  # (file, mmap, strips, slots)
+_open_attempted = False
+
+
+def _size_key(size):
+    return f"{size[0]}x{size[1]}"
+
+
+def _close(atlas):
+    fh, mm = atlas[0], atlas[1]
+    try:
+        mm.close()
+        fh.close()
+    except (OSError, BufferError):
+        pass
+
+
+def open_atlas():
+    global _atlas, _open_attempted
+    _open_attempted = True
+    try:
+        with open(INDEX_PATH, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        fh = open(os.path.join(ATLAS_DIR, index["file"]), "rb")
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, KeyError):
+        return False
+
+    with _lock:
+        old = _atlas
+        _atlas = (fh, mm, index["strips"], index["slots"])
+    if old:
+        _close(old)
+    return True
+
+
+def _get_atlas():
+    if not _open_attempted:
+        open_atlas()
+    return _atlas
+
+
+def has_slot(digest, size):
+    atlas = _get_atlas()
+    return bool(atlas) and digest in atlas[3].get(_size_key(size), {})
+
+
+def lookup(digest, size):
+    atlas = _get_atlas()
+    if not atlas:
+        return None
+    key = _size_key(size)
+    rect = atlas[3].get(key, {}).get(digest)
+    if rect is None:
+        return None
+    x, y, w, h = rect
+    strip = atlas[2][key]
+    start = strip["offset"] + (y * strip["width"] + x) * 4
+    with _lock:
+        if _atlas is not atlas:
+            return None
+        data = atlas[1][start:start + w * h * 4]
+    return Image.frombytes("RGBA", (w, h), data)
+
+
+class AtlasWriter:
+    # Slots must be added size by size; each size becomes one strip
+    def __init__(self):
+        os.makedirs(ATLAS_DIR, exist_ok=True)
+        self.file_name = f"atlas_{os.getpid()}_{threading.get_ident()}.rgba"
+        self._tmp_path = os.path.join(ATLAS_DIR, self.file_name + ".tmp")
+        self._file = open(self._tmp_path, "wb")
+        self._current = None
+        self.strips = {}
+        self.slots = {}
+
+    def add(self, size, digest, rgba_bytes):
+        key = _size_key(size)
+        if key != self._current:
+            if key in self.strips:
+                raise ValueError(f"Atlas strip {key} was already written")
+            self._current = key
+            self.strips[key] = {"offset": self._file.tell(), "width": size[0], "height": 0}
+            self.slots[key] = {}
+        if digest in self.slots[key]:
+            return
+        strip = self.strips[key]
+        self.slots[key][digest] = [0, strip["height"], size[0], size[1]]
+        strip["height"] += size[1]
+        self._file.write(rgba_bytes)
+
+    def commit(self):
+        self._file.close()
+        final_path = os.path.join(ATLAS_DIR, self.file_name)
+        os.replace(self._tmp_path, final_path)
+        index = {"file": self.file_name, "strips": self.strips, "slots": self.slots}
+        tmp_index = INDEX_PATH + ".tmp"
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_index, INDEX_PATH)
+        open_atlas()
+        _remove_stale_files(self.file_name)
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+def _remove_stale_files(keep):
+    for fname in os.listdir(ATLAS_DIR):
+        # .tmp files belong to builds still being written, maybe by another process
+        if fname.startswith("atlas_") and fname != keep and not fname.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(ATLAS_DIR, fname))
+            except OSError:
+                pass  # still mapped elsewhere (Windows); removed on a later build
@@ -0,0 +1,124 @@
+import tkinter as tk
+from globals import COLOR_FG, FONT_DEFAULT
+from image_cache import ICON_CACHE
+from render_service import request_icon, cancel_request, PRIORITY_GRID
+
+# The editing grid of one section drawn on a single canvas. Every cell owns
+# a background rectangle, an image item and a text item created once; edits
+# only itemconfig them, and clicks are mapped to cells arithmetically.
+
+CELL_SIZE = 60
+CELL_GAP = 2  # pixels between neighbouring cells
+ROW_PITCH = CELL_SIZE + 6  # matches the height of a row's picker buttons
+ICON_SIZE = (CELL_SIZE - 6, CELL_SIZE - 6)
+CELL_BG = "#181818"
+CELL_OUTLINE = "#2a2a2a"
+HIGHLIGHT_COLOR = "#1f6aa5"
+
+
+class GridCell:
+    # Not a widget: the cell's state plus the ids of its items on the
+    # section canvas. Carries the attributes Layout.from_grid_cells reads.
+    def __init__(self, grid, row, col, section=None, on_change=None):
+        self.canvas = grid
+        self.row = row
+        self.col = col
+        self.section = section
+        self.on_change = on_change
+        self.content = None
+        self.icon_path = None
+        self.font = (FONT_DEFAULT, 10, "bold")
+        self.tint = COLOR_FG
+        self._ticket = None
+
+        x, y = grid.cell_origin(row, col)
+        center = (x + CELL_SIZE / 2, y + CELL_SIZE / 2)
+        self.rect_item = grid.create_rectangle(x, y, x + CELL_SIZE - 1, y + CELL_SIZE - 1,
+                                               fill=CELL_BG, outline=CELL_OUTLINE)
+        self.image_item = grid.create_image(*center, anchor="center", state="hidden")
+        self.text_item = grid.create_text(*center, anchor="center", state="hidden")
+
+    def load_icon(self, path, tint=COLOR_FG, priority=PRIORITY_GRID):
+        # Renders off the Tk thread; the cell shows the icon once it arrives
+        cancel_request(self._ticket)
+        self._ticket = None
+        if isinstance(self.content, str):
+            self.content = None
+            self.canvas.itemconfigure(self.text_item, state="hidden")
+        self.icon_path = path
+        self.tint = tint
+
+        def on_ready(photo):
+            self._ticket = None
+            if photo is not None and self.icon_path == path and self.tint == tint:
+                self.set_icon(photo, path=path, tint=tint)
+
+        self._ticket = request_icon(path, ICON_SIZE, tint, on_ready, priority)
+        self._changed()
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change(self.section, self.row, self.col)
+
+    def set_icon(self, image, path=None, tint=COLOR_FG):
+        # Keep the displayed photo pinned so the icon cache never evicts it
+        if self.content is not None and not isinstance(self.content, str):
+            ICON_CACHE.unpin_image(self.content)
+        ICON_CACHE.pin_image(image)
+        self.content = image
+        self.icon_path = path
+        self.tint = tint
+        self.canvas.itemconfigure(self.text_item, state="hidden")
+        self.canvas.itemconfigure(self.image_item, image=image, state="normal")
+
+    def set_text(self, text, font=None, color=COLOR_FG):
+        cancel_request(self._ticket)
+        self._ticket = None
+        if self.content is not None and not isinstance(self.content, str):
+            ICON_CACHE.unpin_image(self.content)
+        self.content = text
+        if font:
+            self.font = font
+        self.tint = color
+        self.canvas.itemconfigure(self.image_item, image="", state="hidden")
+        self.canvas.itemconfigure(self.text_item, text=text, font=self.font, fill=color, state="normal")
+        self._changed()
+
+    def highlight(self, color=HIGHLIGHT_COLOR):
+        self.canvas.itemconfigure(self.rect_item, outline=color, width=3)
+
+    def unhighlight(self):
+        self.canvas.itemconfigure(self.rect_item, outline=CELL_OUTLINE, width=1)
+
+
+class SectionGrid(tk.Canvas):
+    def __init__(self, master, section, rows, columns, on_change=None, on_click=None, **kwargs):
+        super().__init__(master, width=columns * (CELL_SIZE + CELL_GAP), height=rows * ROW_PITCH,
+                         highlightthickness=0, **kwargs)
+        self.section = section
+        self.rows = rows
+        self.columns = columns
+        self.on_click = on_click
+        self.cells = {
+            (row, col): GridCell(self, row, col, section=section, on_change=on_change)
+            for row in range(rows) for col in range(columns)
+        }
+        self.bind("<Button-1>", self._clicked)
+
+    def cell_origin(self, row, col):
+        # Top-left pixel of a cell; cells sit centered in their row band
+        return (col * (CELL_SIZE + CELL_GAP) + CELL_GAP // 2,
+                row * ROW_PITCH + (ROW_PITCH - CELL_SIZE) // 2)
+
+    def cell_at(self, x, y):
+        # (row, col) under a canvas pixel, or None in the gaps between cells
+        col, dx = divmod(int(x) - CELL_GAP // 2, CELL_SIZE + CELL_GAP)
+        row, dy = divmod(int(y) - (ROW_PITCH - CELL_SIZE) // 2, ROW_PITCH)
+        if not (0 <= row < self.rows and 0 <= col < self.columns) or dx >= CELL_SIZE or dy >= CELL_SIZE:
+            return None
+        return row, col
+
+    def _clicked(self, event):
+        pos = self.cell_at(self.canvasx(event.x), self.canvasy(event.y))
+        if pos is not None and self.on_click:
+            self.on_click(self.section, *pos)
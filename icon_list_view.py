@@ -0,0 +1,236 @@
+import math
+import tkinter as tk
+from tkinter import ttk
+from globals import COLOR_BG, COLOR_FG, FONT_DEFAULT
+from image_cache import ICON_CACHE
+from render_service import request_icon, cancel_request, PRIORITY_PICKER, PRIORITY_PREFETCH
+from tag_pills import pill_image, pill_width
+
+ROW_HEIGHT = 62
+ROW_GAP = 6
+OVERSCAN = 4
+PREFETCH_ROWS = 20  # thumbnails rendered ahead of the scroll position
+THUMB_SIZE = (40, 40)
+ROW_BG = "#2a2a2a"
+ROW_BG_SELECTED = "#444477"
+PILL_SPACING = 4  # pack padx on both sides of a pill
+OVERFLOW_PILL_COLORS = ("#444", "white")
+
+
+class _Row:
+    # One recycled set of widgets; rebound to whichever entry scrolls under it
+    def __init__(self, view):
+        self.view = view
+        self.index = None
+        self.photo = None
+        self.ticket = None
+        self.frame = tk.Frame(view.canvas, bg=ROW_BG, padx=4, pady=4)
+        self.frame.grid_propagate(False)
+        # Fixed-size holder so rows keep their layout while a thumbnail streams in
+        self.icon_holder = tk.Frame(self.frame, bg=ROW_BG, width=THUMB_SIZE[0], height=THUMB_SIZE[1])
+        self.icon_holder.pack_propagate(False)
+        self.icon_holder.grid(row=0, column=0, rowspan=2, padx=5)
+        self.icon_label = tk.Label(self.icon_holder, bg=ROW_BG, bd=0)
+        self.icon_label.pack(fill="both", expand=True)
+        self.name_label = tk.Label(self.frame, fg="white", bg=ROW_BG, font=(FONT_DEFAULT, 10), anchor="w")
+        self.name_label.grid(row=0, column=1, sticky="w")
+        self.tag_frame = tk.Frame(self.frame, bg=ROW_BG)
+        self.tag_frame.grid(row=1, column=1, sticky="w", pady=(2, 0))
+        self.pills = []
+        self.window = view.canvas.create_window(0, 0, window=self.frame, anchor="nw", state="hidden")
+        for widget in (self.frame, self.icon_holder, self.icon_label, self.name_label, self.tag_frame):
+            widget.bind("<Button-1>", self._on_click)
+
+    def _on_click(self, _event=None):
+        if self.index is not None:
+            self.view.select_index(self.index)
+
+    def _pill(self, i):
+        while len(self.pills) <= i:
+            pill = tk.Label(self.tag_frame, bg=ROW_BG, bd=0, padx=0, pady=0, highlightthickness=0)
+            pill.bind("<Button-1>", self._on_click)
+            self.pills.append(pill)
+        return self.pills[i]
+
+    def bind(self, index, entry):
+        self.index = index
+        self._request_photo(entry)
+        self.name_label.config(text=entry.name)
+        self._bind_pills(entry.tags)
+        self.set_selected(index == self.view.selected_index)
+        self.view.canvas.coords(self.window, ROW_GAP, index * ROW_HEIGHT + ROW_GAP // 2)
+        self.view.canvas.itemconfigure(self.window, state="normal")
+
+    def _bind_pills(self, tags):
+        # Single line of pills; whatever does not fit collapses into "+N"
+        max_width = self.view.pill_width_budget()
+        used = 0
+        shown = 0
+        for i, tag in enumerate(tags):
+            width = pill_width(tag) + PILL_SPACING
+            remaining = len(tags) - i - 1
+            reserve = pill_width(f"+{remaining}") + PILL_SPACING if remaining else 0
+            if used + width + reserve > max_width:
+                break
+            self._pill(shown).config(image=pill_image(tag))
+            used += width
+            shown += 1
+        if shown < len(tags):
+            overflow = f"+{len(tags) - shown}"
+            self._pill(shown).config(image=pill_image(overflow, OVERFLOW_PILL_COLORS))
+            shown += 1
+        for i, pill in enumerate(self.pills):
+            if i < shown:
+                pill.pack(side="left", padx=2, pady=1)
+            else:
+                pill.pack_forget()
+
+    def _request_photo(self, entry):
+        # Thumbnails stream in from the render service; the row stays clickable
+        cancel_request(self.ticket)
+        self.ticket = None
+        self.set_photo(None)
+        index = self.index
+
+        def on_ready(photo):
+            if self.index == index:
+                self.ticket = None
+                self.set_photo(photo)
+
+        self.ticket = request_icon(entry.file, THUMB_SIZE, COLOR_FG, on_ready, PRIORITY_PICKER)
+
+    def set_photo(self, photo):
+        # Only rows on screen hold their thumbnails; the rest stay evictable
+        if self.photo is not None:
+            ICON_CACHE.unpin_image(self.photo)
+        self.photo = photo
+        if photo is not None:
+            ICON_CACHE.pin_image(photo)
+        self.icon_label.config(image=photo or "")
+
+    def set_selected(self, selected):
+        bg = ROW_BG_SELECTED if selected else ROW_BG
+        for widget in (self.frame, self.icon_holder, self.icon_label, self.name_label, self.tag_frame, *self.pills):
+            widget.config(bg=bg)
+
+    def release(self):
+        self.index = None
+        cancel_request(self.ticket)
+        self.ticket = None
+        self.set_photo(None)
+        self.view.canvas.itemconfigure(self.window, state="hidden")
+
+
+class IconListView(tk.Frame):
+    # Virtualized list of icon entries: only rows inside the viewport (plus a
+    # small overscan) have widgets, and those widgets are recycled on scroll,
+    # so widget count and thumbnail memory do not grow with the match count.
+    def __init__(self, parent, on_select=None, bg=COLOR_BG):
+        super().__init__(parent, bg=bg)
+        self.on_select = on_select
+        self.entries = []
+        self.selected_index = None
+        self._rows = {}  # entry index -> _Row
+        self._free_rows = []
+        self._row_width = 1
+        self._refresh_pending = None
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0, yscrollincrement=ROW_HEIGHT // 3)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.bind("<Configure>", self._on_configure)
+
+        self.message = tk.Label(self.canvas, bg=bg, fg="#bbb", font=(FONT_DEFAULT, 10),
+                                justify="left", wraplength=380)
+
+    def show_message(self, text):
+        self.set_entries([])
+        self.message.config(text=text)
+        self.message.place(relx=0.5, y=40, anchor="n")
+
+    def set_entries(self, entries):
+        self.message.place_forget()
+        for row in self._rows.values():
+            row.release()
+            self._free_rows.append(row)
+        self._rows.clear()
+        self.entries = entries
+        self.selected_index = None
+        self.canvas.configure(scrollregion=(0, 0, 0, len(entries) * ROW_HEIGHT))
+        self.canvas.yview_moveto(0)
+        self.refresh()
+
+    def selected_entry(self):
+        if self.selected_index is None:
+            return None
+        return self.entries[self.selected_index]
+
+    def select_index(self, index):
+        previous = self._rows.get(self.selected_index)
+        if previous:
+            previous.set_selected(False)
+        self.selected_index = index
+        row = self._rows.get(index)
+        if row:
+            row.set_selected(True)
+        if self.on_select:
+            self.on_select(self.entries[index])
+
+    def pill_width_budget(self):
+        return max(0, self.canvas.winfo_width() - THUMB_SIZE[0] - 4 * ROW_GAP - 20)
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_refresh()
+
+    def _on_configure(self, event):
+        self._row_width = max(1, event.width - 2 * ROW_GAP)
+        # Pill overflow depends on the width, so rebind what is on screen
+        for index, row in self._rows.items():
+            self.canvas.itemconfigure(row.window, width=self._row_width, height=ROW_HEIGHT - ROW_GAP)
+            row.bind(index, self.entries[index])
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if self._refresh_pending is None:
+            self._refresh_pending = self.after_idle(self.refresh)
+
+    def refresh(self):
+        self._refresh_pending = None
+        if not self.entries:
+            return
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), ROW_HEIGHT)
+        first = max(0, int(top // ROW_HEIGHT) - OVERSCAN)
+        last = min(len(self.entries), math.ceil((top + height) / ROW_HEIGHT) + OVERSCAN)
+
+        for index in [i for i in self._rows if not first <= i < last]:
+            row = self._rows.pop(index)
+            row.release()
+            self._free_rows.append(row)
+
+        for index in range(first, last):
+            if index in self._rows:
+                continue
+            row = self._free_rows.pop() if self._free_rows else self._new_row()
+            row.bind(index, self.entries[index])
+            self._rows[index] = row
+
+        for entry in self.entries[last:last + PREFETCH_ROWS]:
+            request_icon(entry.file, THUMB_SIZE, COLOR_FG, priority=PRIORITY_PREFETCH)
+
+    def _new_row(self):
+        row = _Row(self)
+        self.canvas.itemconfigure(row.window, width=self._row_width, height=ROW_HEIGHT - ROW_GAP)
+        return row
+
+    def destroy(self):
+        if self._refresh_pending is not None:
+            self.after_cancel(self._refresh_pending)
+            self._refresh_pending = None
+        for row in self._rows.values():
+            row.release()
+        self._rows.clear()
+        super().destroy()
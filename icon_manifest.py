@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import re
+from content_hash import remember_hash
+
+# Persisted listing of the icons folder. Each record keeps the parsed name and
+# tags plus the stat signature, content hash and viewBox of its SVG, so a warm
+# start is a single scandir with stat comparisons; only new or changed files
+# are read and parsed again.
+MANIFEST_DIR = os.path.join("cache", "manifest")
+MANIFEST_VERSION = 1
+
+_VIEWBOX_RE = re.compile(rb"""viewBox\s*=\s*["']([^"']*)["']""")
+_VIEWBOX_SCAN_BYTES = 4096
+
+
+def manifest_path(icon_folder):
+    folder_key = hashlib.sha1(os.path.abspath(icon_folder).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(MANIFEST_DIR, f"icons_{folder_key}.json")
+
+
+def parse_viewbox(svg_data):
+    match = _VIEWBOX_RE.search(svg_data[:_VIEWBOX_SCAN_BYTES])
+    if not match:
+        return None
+    try:
+        values = [float(v) for v in match.group(1).replace(b",", b" ").split()]
+    except ValueError:
+        return None
+    return values if len(values) == 4 else None
+
+
+def _read_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if data.get("version") != MANIFEST_VERSION:
+        return []
+    return data.get("icons", [])
+
+
+def _write_manifest(path, records):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "icons": records}, f)
+    os.replace(tmp_path, path)
+
+
+def _build_record(entry, parse_filename):
+    with open(entry.path, "rb") as f:
+        svg_data = f.read()
+    name, tags = parse_filename(entry.name)
+    st = entry.stat()
+    return {
+        "file": entry.name,
+        "name": name,
+        "tags": tags,
+        "path": entry.path,
+        "size": st.st_size,
+        "mtime": st.st_mtime_ns,
+        "hash": hashlib.sha1(svg_data).hexdigest(),
+        "viewbox": parse_viewbox(svg_data),
+    }
+
+
+def scan_icons(icon_folder, parse_filename, sort_key=None):
+    path = manifest_path(icon_folder)
+    saved = _read_manifest(path)
+    previous = {record["file"]: record for record in saved}
+    records = []
+    changed = False
+
+    with os.scandir(icon_folder) as it:
+        for entry in it:
+            if not entry.name.lower().endswith(".svg") or not entry.is_file():
+                continue
+            st = entry.stat()
+            record = previous.pop(entry.name, None)
+            if (record is None or record["size"] != st.st_size
+                    or record["mtime"] != st.st_mtime_ns or record["path"] != entry.path):
+                try:
+                    record = _build_record(entry, parse_filename)
+                except OSError as e:
+                    print(f"[WARN] Could not index icon {entry.path}: {e}")
+                    continue
+                changed = True
+            records.append(record)
+
+    # Anything left over was deleted from the folder
+    changed = changed or bool(previous)
+
+    if changed:
+        if sort_key:
+            records.sort(key=sort_key)
+        try:
+            _write_manifest(path, records)
+        except OSError as e:
+            print(f"[WARN] Could not write icon manifest {path}: {e}")
+    else:
+        # Unchanged folder: the saved records are already in sorted order
+        records = saved
+
+    # Seed the content hash memo so rasterizing never re-reads a known icon
+    for record in records:
+        remember_hash(record["path"], (record["size"], record["mtime"]), record["hash"])
+    return records
+
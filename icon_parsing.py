@@ -1,16 +1,21 @@
-import os
 import re
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from PIL import Image, ImageTk
-import cairosvg
-import io
-ICON_THUMBNAIL_CACHE = {}
+from raster_cache import load_image
+from image_cache import ICON_CACHE
+from icon_manifest import scan_icons
+
+# Thumbnails share the bounded icon cache with the rest of the app
+ICON_THUMBNAIL_CACHE = ICON_CACHE
 
 class IconEntry:
-    def __init__(self, name: str, tags: List[str], filepath: str):
+    def __init__(self, name: str, tags: List[str], filepath: str,
+                 content_hash: Optional[str] = None, viewbox: Optional[List[float]] = None):
         self.name = name
         self.tags = tags
         self.file = filepath
+        self.content_hash = content_hash
+        self.viewbox = viewbox
         self.thumbnail = None  # to be loaded lazily
 
     def __lt__(self, other):
@@ -23,13 +28,11 @@ class IconEntry:
         key = (self.file, size)
         if self.thumbnail:
             return self.thumbnail
-        if key in ICON_THUMBNAIL_CACHE:
-            return ICON_THUMBNAIL_CACHE[key]
+        cached = ICON_THUMBNAIL_CACHE.get(key)
+        if cached is not None:
+            return cached
         try:
-            with open(self.file, 'rb') as f:
-                svg_data = f.read()
-            png_data = cairosvg.svg2png(bytestring=svg_data, output_width=size[0], output_height=size[1])
-            image = Image.open(io.BytesIO(png_data))
+            image = load_image(self.file, size=size)
             image.thumbnail(size, Image.LANCZOS)
             self.thumbnail = ImageTk.PhotoImage(image)
             ICON_THUMBNAIL_CACHE[key] = self.thumbnail
@@ -50,11 +53,10 @@ def parse_icon_filename(filename: str) -> Tuple[str, List[str]]:
     return name, tags
 
 def load_icon_entries(icon_folder: str) -> List[IconEntry]:
-    entries = []
-    for fname in os.listdir(icon_folder):
-        if fname.lower().endswith(".svg"):
-            name, tags = parse_icon_filename(fname)
-            path = os.path.join(icon_folder, fname)
-            entries.append(IconEntry(name, tags, path))
-    entries.sort()
-    return entries
\ No newline at end of file
+    # Backed by the persisted manifest; only new or changed SVGs are re-parsed
+    records = scan_icons(icon_folder, parse_icon_filename,
+                         sort_key=lambda r: (r["tags"], r["name"].lower()))
+    return [
+        IconEntry(r["name"], r["tags"], r["path"], content_hash=r["hash"], viewbox=r["viewbox"])
+        for r in records
+    ]
@@ -3,7 +3,8 @@ from tkinter import ttk
 import os
 from PIL import ImageTk
 from icon_parsing import load_icon_entries  # Ensure this is available
-from globals import get_cached_icon, COLOR_BG, COLOR_FG, FONT_DEFAULT, TAG_COLOR_MAP
+from globals import get_cached_icon, COLOR_BG, COLOR_FG, FONT_DEFAULT
+from tag_pills import pill_image
 
 class IconPickerDialog(tk.Toplevel):
     def __init__(self, parent, icon_entries):
@@ -66,9 +67,7 @@ class IconPickerDialog(tk.Toplevel):
 
     def render_tag_pills(self, parent, tags):
         for tag in tags:
-            bg, fg = TAG_COLOR_MAP.get(tag, ("#444", "white"))
-            tk.Label(parent, text=tag, bg=bg, fg=fg, font=(FONT_DEFAULT, 8, "bold"),
-                     padx=5, pady=1, relief="solid", borderwidth=1).pack(side="left", padx=2, pady=2)
+            tk.Label(parent, image=pill_image(tag), bg=parent["bg"], bd=0).pack(side="left", padx=2, pady=2)
 
     def populate_icons(self):
         for entry in self.filtered_entries:
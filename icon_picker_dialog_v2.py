@@ -1,17 +1,25 @@
 import tkinter as tk
 from tkinter import ttk
-from globals import COLOR_BG, COLOR_FG, FONT_DEFAULT, get_cached_icon, TAG_COLOR_MAP
+from globals import COLOR_BG, FONT_DEFAULT
+from icon_list_view import IconListView
+from tag_index import TagIndex
+
+TAG_BG = "#2e2e2e"
+TAG_BG_INCLUDED = "#445577"
+TAG_BG_EXCLUDED = "#774444"
 
 class IconPickerDialogV2(tk.Toplevel):
-    def __init__(self, parent, icon_entries):
+    def __init__(self, parent, icon_entries, tag_index=None):
         super().__init__(parent)
         self.title("Pick an Icon")
         self.configure(bg=COLOR_BG)
         self.icon_entries = icon_entries
+        self.tag_index = tag_index or TagIndex(icon_entries)
         self.result = None
-        self.selected_tag = None
-        self.selected_row = None
-        self.rendering_complete = True  # Controls click blocking
+        self.included_tags = set()
+        self.excluded_tags = set()
+        self.match_any = tk.BooleanVar(value=False)
+        self.tag_buttons = {}
         self._active_scroll_target = None
 
         self.geometry("820x700")
@@ -46,43 +54,30 @@ class IconPickerDialogV2(tk.Toplevel):
 
         tag_panel = tag_scrollable_frame
         tk.Label(tag_panel, text="Tags", bg="#1e1e1e", fg="white", font=(FONT_DEFAULT, 10, "bold")).pack(anchor="nw", padx=8, pady=5)
-
-        all_tags = set()
-
-        for entry in icon_entries:
-            if entry.tags:
-                all_tags.update(entry.tags[:2])
-            else:
-                all_tags.add("Unknown")
-
-        all_tags = sorted(all_tags)
-
-        for tag in all_tags:
-            btn = tk.Button(tag_panel, text=tag, bg="#2e2e2e", fg="white", relief="flat",
-                            font=(FONT_DEFAULT, 9), anchor="w")
+        tk.Label(tag_panel, text="Click to require, right-click to exclude", bg="#1e1e1e", fg="#888",
+                 font=(FONT_DEFAULT, 8), wraplength=180, justify="left").pack(anchor="nw", padx=8)
+        tk.Checkbutton(tag_panel, text="Match any required tag", variable=self.match_any,
+                       command=self.refresh_filter, bg="#1e1e1e", fg="white", selectcolor="#2e2e2e",
+                       activebackground="#1e1e1e", activeforeground="white",
+                       font=(FONT_DEFAULT, 9)).pack(anchor="nw", padx=4, pady=(2, 4))
+
+        for tag in self.tag_index.tags():
+            btn = tk.Button(tag_panel, text=f"{tag} ({self.tag_index.count(tag)})", bg=TAG_BG, fg="white",
+                            relief="flat", font=(FONT_DEFAULT, 9), anchor="w")
             btn.pack(fill="x", padx=6, pady=1)
-            btn.bind("<Button-1>", lambda e, t=tag, b=btn: self.toggle_tag_filter(t, b))
+            btn.bind("<Button-1>", lambda e, t=tag: self.toggle_tag_filter(t))
+            btn.bind("<Button-3>", lambda e, t=tag: self.toggle_tag_filter(t, exclude=True))
+            btn.bind("<Button-2>", lambda e, t=tag: self.toggle_tag_filter(t, exclude=True))
+            self.tag_buttons[tag] = btn
 
         # --- ICON LIST PANEL ---
         outer = tk.Frame(main_frame, bg=COLOR_BG)
         outer.pack(side="right", fill="both", expand=True)
 
-        self.canvas = tk.Canvas(outer, bg=COLOR_BG, highlightthickness=0)
-        self.scrollable_frame = tk.Frame(self.canvas, bg=COLOR_BG)
-        canvas_frame = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-
-        scrollbar = ttk.Scrollbar(outer, orient="vertical", command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-
-        def update_scrollregion(_=None):
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-            self.canvas.itemconfig(canvas_frame, width=self.canvas.winfo_width())
-
-        self.scrollable_frame.bind("<Configure>", update_scrollregion)
-        self.canvas.bind("<Configure>", update_scrollregion)
-
-        self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # Only the rows in view get widgets, so large tags open instantly
+        self.icon_list = IconListView(outer, on_select=self.select_icon)
+        self.icon_list.pack(fill="both", expand=True)
+        self.canvas = self.icon_list.canvas
 
         # Mousewheel routing
         self.canvas.bind("<Enter>", lambda e: self._set_active_scroll_target(self.canvas))
@@ -94,7 +89,6 @@ class IconPickerDialogV2(tk.Toplevel):
         self.bind("<Button-4>", lambda e: self._on_mouse_scroll(e, delta=-1))
         self.bind("<Button-5>", lambda e: self._on_mouse_scroll(e, delta=1))
 
-        self.entry_frames = []
         self.show_instruction_text()
 
         # Footer buttons
@@ -118,128 +112,43 @@ class IconPickerDialogV2(tk.Toplevel):
         widget.yview_scroll(direction, "units")
 
     def show_instruction_text(self):
-        for f in self.entry_frames:
-            f.destroy()
-        self.entry_frames.clear()
-
         msg = ("Pick a tag from the list of recognized tags, or add images to the icons folder\n"
                "following the pattern:\nicon name [tag1, tag2, tag3, tag4].svg")
-        label = tk.Label(self.scrollable_frame, text=msg, bg=COLOR_BG, fg="#bbb", font=(FONT_DEFAULT, 10),
-                         justify="left", wraplength=380)
-        label.pack(pady=40, padx=20)
-        self.entry_frames.append(label)
+        self.icon_list.show_message(msg)
 
     def populate_icons(self):
-        self.canvas.yview_moveto(0)
-        self.rendering_complete = False
-
-        self.loading_overlay = tk.Frame(self.canvas, bg="#111")
-        self.loading_overlay.place(in_=self.canvas, relx=0, rely=0, relwidth=1, relheight=1)
-
-        tk.Label(self.loading_overlay, text="Loading icons...", fg="white", bg="#111", font=(FONT_DEFAULT, 12, "bold")).pack(pady=20)
-        progress = ttk.Progressbar(self.loading_overlay, mode="indeterminate")
-        progress.pack(pady=10, fill="x", padx=20)
-        progress.start(10)
-
-        self.scrollable_frame.update_idletasks()
-        self.after(50, lambda: self._populate_icons_lazy(progress))
-
-    def _populate_icons_lazy(self, progress):
-        for f in self.entry_frames:
-            f.destroy()
-        self.entry_frames.clear()
-
-        filtered = [
-            e for e in self.icon_entries
-            if (not self.selected_tag)
-            or (self.selected_tag == "Unknown" and not e.tags)
-            or (self.selected_tag in e.tags)
-        ]
-
-        self._render_batch(filtered, 0, 30, progress)
-
-    def _render_batch(self, entries, index, batch_size, progress):
-        if index >= len(entries):
-            progress.stop()
-            self.loading_overlay.destroy()
-            self.scrollable_frame.configure(bg=COLOR_BG)
-            self.scrollable_frame.update_idletasks()
-            self.rendering_complete = True
-            return
+        self.result = None
+        self.icon_list.set_entries(self.filtered_entries())
 
-        for i in range(index, min(index + batch_size, len(entries))):
-            entry = entries[i]
-            if not entry.thumbnail:
-                entry.thumbnail = get_cached_icon(entry.file, size=(40, 40), color=COLOR_FG)
-            if not entry.thumbnail:
-                continue
-
-            frame = tk.Frame(self.scrollable_frame, bg="#2a2a2a", padx=4, pady=4)
-            frame.pack(fill="x", padx=6, pady=3)
-            self.entry_frames.append(frame)
-
-            icon_label = tk.Label(frame, image=entry.thumbnail, bg="#2a2a2a")
-            icon_label.image = entry.thumbnail
-            icon_label.grid(row=0, column=0, rowspan=2, padx=5, pady=5)
-
-            name_label = tk.Label(frame, text=entry.name, fg="white", bg="#2a2a2a", font=(FONT_DEFAULT, 10))
-            name_label.grid(row=0, column=1, sticky="w")
-
-            tag_frame = tk.Frame(frame, bg="#2a2a2a")
-            tag_frame.grid(row=1, column=1, sticky="w", pady=(2, 0))
-            self.render_tag_pills(tag_frame, entry.tags, entry, frame)
-
-            for widget in (frame, icon_label, name_label, tag_frame):
-                widget.bind("<Button-1>", lambda e, ent=entry, fr=frame: self.select_icon(ent, fr))
-
-        self.after(10, lambda: self._render_batch(entries, index + batch_size, batch_size, progress))
-
-    def render_tag_pills(self, parent, tags, entry, frame):
-        max_width = 400
-        row = tk.Frame(parent, bg=parent['bg'])
-        row.pack(anchor="w", fill="x")
-        current_width = 0
-        for tag in tags:
-            bg, fg = TAG_COLOR_MAP.get(tag, ("#444", "white"))
-            pill = tk.Label(row, text=tag, bg=bg, fg=fg, font=(FONT_DEFAULT, 8, "bold"),
-                            padx=5, pady=1, relief="solid", borderwidth=1)
-            pill.update_idletasks()
-            pill_width = pill.winfo_reqwidth() + 10
-            if current_width + pill_width > max_width:
-                row = tk.Frame(parent, bg=parent['bg'])
-                row.pack(anchor="w", fill="x")
-                current_width = 0
-            pill.pack(side="left", padx=2, pady=1)
-            pill.bind("<Button-1>", lambda e, ent=entry, fr=frame: self.select_icon(ent, fr))
-            current_width += pill_width
-
-    def select_icon(self, entry, frame):
-        if not self.rendering_complete:
-            return
+    def select_icon(self, entry):
         self.result = entry
-        if self.selected_row:
-            try: self.selected_row.config(bg="#2a2a2a")
-            except tk.TclError: pass
-        self.selected_row = frame
-        self.selected_row.config(bg="#444477")
-
-    def toggle_tag_filter(self, tag, button):
-        if self.selected_tag == tag:
-            self.selected_tag = None
-            button.config(bg="#2e2e2e")
+
+    def filtered_entries(self):
+        if self.match_any.get():
+            return self.tag_index.query(any_of=self.included_tags, none_of=self.excluded_tags)
+        return self.tag_index.query(all_of=self.included_tags, none_of=self.excluded_tags)
+
+    def toggle_tag_filter(self, tag, exclude=False):
+        target, other = (self.excluded_tags, self.included_tags) if exclude else (self.included_tags, self.excluded_tags)
+        if tag in target:
+            target.discard(tag)
         else:
-            self.selected_tag = tag
-            for child in button.master.winfo_children():
-                if isinstance(child, tk.Button):
-                    child.config(bg="#2e2e2e")
-            button.config(bg="#445577")
-
-        for f in self.entry_frames:
-            f.destroy()
-        self.entry_frames.clear()
-
-        if self.selected_tag:
-            self.after(50, self.populate_icons)
+            target.add(tag)
+            other.discard(tag)
+
+        button = self.tag_buttons[tag]
+        if tag in self.included_tags:
+            button.config(bg=TAG_BG_INCLUDED)
+        elif tag in self.excluded_tags:
+            button.config(bg=TAG_BG_EXCLUDED)
+        else:
+            button.config(bg=TAG_BG)
+        self.refresh_filter()
+        return "break"
+
+    def refresh_filter(self):
+        if self.included_tags or self.excluded_tags:
+            self.populate_icons()
         else:
             self.show_instruction_text()
 
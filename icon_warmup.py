@@ -0,0 +1,166 @@
+import io
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from content_hash import file_hash, stat_signature, remember_hash
+import icon_atlas
+import raster_cache
+
+# Sizes the UI asks for right after startup: picker thumbnails and grid cells
+WARMUP_SIZES = icon_atlas.ATLAS_SIZES
+CHUNK_SIZE = 16
+POLL_MS = 30
+
+
+def _render_chunk(jobs):
+    # Runs in a worker process: fills the on-disk cache and ships PNG bytes back
+    results = []
+    for svg_path, size in jobs:
+        try:
+            signature = stat_signature(svg_path)
+            digest = file_hash(svg_path)
+            png_data = raster_cache.load_png_bytes(svg_path, size)
+            results.append((svg_path, size, signature, digest, png_data, None))
+        except Exception as e:
+            results.append((svg_path, size, None, None, None, str(e)))
+    return results
+
+
+def build_library_atlas(svg_paths, sizes=None, cancelled=lambda: False):
+    # Packs the already warm PNG cache into the memory-mapped atlas
+    writer = icon_atlas.AtlasWriter()
+    try:
+        for size in sizes or icon_atlas.ATLAS_SIZES:
+            for svg_path in svg_paths:
+                if cancelled():
+                    writer.abort()
+                    return False
+                try:
+                    png_data = raster_cache.load_png_bytes(svg_path, size)
+                    image = Image.open(io.BytesIO(png_data)).convert("RGBA")
+                except Exception as e:
+                    print(f"[WARN] Skipping {svg_path} in icon atlas: {e}")
+                    continue
+                if image.size != size:
+                    image = image.resize(size, Image.LANCZOS)
+                writer.add(size, file_hash(svg_path), image.tobytes())
+        writer.commit()
+        return True
+    except OSError as e:
+        writer.abort()
+        print(f"[WARN] Could not build icon atlas: {e}")
+        return False
+
+
+class IconWarmup:
+    def __init__(self, root, svg_paths, sizes=None, on_progress=None, on_done=None, max_workers=None):
+        self.root = root
+        self.svg_paths = list(svg_paths)
+        self.sizes = sizes or WARMUP_SIZES
+        self.jobs = self._missing_jobs()
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.done_count = 0
+        self.rendered_count = 0  # jobs that produced a raster the atlas can pack
+        self.cancelled = False
+        self.finished = False
+        self._executor = None
+        self._futures = []
+        self._results = queue.Queue()
+        self._pending = 0
+        self._after_id = None
+
+    def _missing_jobs(self):
+        # Icons already packed in the atlas are served from it directly
+        jobs = []
+        for path in self.svg_paths:
+            try:
+                digest = file_hash(path)
+            except OSError:
+                continue
+            for size in self.sizes:
+                if not icon_atlas.has_slot(digest, size):
+                    jobs.append((path, size))
+        return jobs
+
+    def start(self):
+        if not self.jobs:
+            self._finish()
+            return
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        for i in range(0, len(self.jobs), CHUNK_SIZE):
+            future = self._executor.submit(_render_chunk, self.jobs[i:i + CHUNK_SIZE])
+            future.add_done_callback(self._results.put)
+            self._futures.append(future)
+            self._pending += 1
+        self._after_id = self.root.after(POLL_MS, self._poll)
+
+    def cancel(self):
+        if self.cancelled or self.finished:
+            return
+        self.cancelled = True
+        if self._after_id:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        if self._executor:
+            # shutdown(cancel_futures=True) needs Python 3.9
+            for future in self._futures:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _poll(self):
+        self._after_id = None
+        if self.cancelled:
+            return
+        while True:
+            try:
+                future = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if future.cancelled():
+                continue
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"[WARN] Icon warm-up worker failed: {e}")
+                continue
+            for svg_path, size, signature, digest, png_data, error in results:
+                self.done_count += 1
+                if error:
+                    print(f"[WARN] Could not pre-render {svg_path}: {error}")
+                    continue
+                self.rendered_count += 1
+                remember_hash(svg_path, signature, digest)
+                if not raster_cache.has_mask(digest, size):
+                    raster_cache.remember_png(digest, size, png_data)
+            if self.on_progress:
+                self.on_progress(self.done_count, len(self.jobs))
+
+        if self._pending <= 0:
+            self._finish()
+        else:
+            self._after_id = self.root.after(POLL_MS, self._poll)
+
+    def _finish(self):
+        self.finished = True
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        # Icons that fail to render stay missing from the atlas; rebuilding for
+        # them alone would repeat the full build on every start
+        if self.rendered_count:
+            threading.Thread(
+                target=build_library_atlas,
+                args=(self.svg_paths, self.sizes, lambda: self.cancelled),
+                daemon=True
+            ).start()
+        if self.on_done:
+            self.on_done()
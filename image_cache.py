@@ -0,0 +1,150 @@
+import threading
+from collections import OrderedDict
+
+# Byte budgets for the shared caches; adjust with ImageCache.set_budget()
+ICON_CACHE_BUDGET = 96 * 1024 * 1024
+MASK_CACHE_BUDGET = 32 * 1024 * 1024
+PROOF_TILE_BUDGET = 64 * 1024 * 1024
+
+_BYTES_PER_PIXEL = {"1": 1, "L": 1, "P": 1, "LA": 2, "RGB": 3, "RGBA": 4}
+
+
+def image_nbytes(image):
+    # PIL images expose size/mode, Tk photos only width()/height() (stored as RGBA)
+    size = getattr(image, "size", None)
+    if isinstance(size, tuple):
+        return size[0] * size[1] * _BYTES_PER_PIXEL.get(getattr(image, "mode", "RGBA"), 4)
+    try:
+        return image.width() * image.height() * 4
+    except Exception:
+        return 0
+
+
+class ImageCache:
+    def __init__(self, budget_bytes, name="images"):
+        self.name = name
+        self.budget_bytes = budget_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (image, nbytes)
+        self._keys_by_id = {}
+        self._pins = {}
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, key):
+        image = self.get(key)
+        if image is None:
+            raise KeyError(key)
+        return image
+
+    def __setitem__(self, key, image):
+        self.put(key, image)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, image):
+        # Returns the cached image. A pinned entry is kept rather than replaced:
+        # its pins were taken through that image and must stay releasable.
+        nbytes = image_nbytes(image)
+        with self._lock:
+            if key in self._pins and key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            self._discard(key)
+            self._entries[key] = (image, nbytes)
+            self._keys_by_id[id(image)] = key
+            self.current_bytes += nbytes
+            self._evict()
+            return image
+
+    def discard(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def pin(self, key):
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key):
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+            self._evict()
+
+    def pin_image(self, image):
+        key = self._keys_by_id.get(id(image))
+        if key is not None:
+            self.pin(key)
+        return key
+
+    def unpin_image(self, image):
+        key = self._keys_by_id.get(id(image))
+        if key is not None:
+            self.unpin(key)
+        return key
+
+    def set_budget(self, budget_bytes):
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_id.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "budget_bytes": self.budget_bytes,
+                "pinned": len(self._pins),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._keys_by_id.pop(id(entry[0]), None)
+            self.current_bytes -= entry[1]
+
+    def _evict(self):
+        if self.current_bytes <= self.budget_bytes:
+            return
+        # Oldest first; pinned images are on screen and must survive
+        for key in list(self._entries):
+            if self.current_bytes <= self.budget_bytes:
+                break
+            if key in self._pins:
+                continue
+            self._discard(key)
+            self.evictions += 1
+
+
+# One shared manager for every Tk photo built from an icon
+ICON_CACHE = ImageCache(ICON_CACHE_BUDGET, "icons")
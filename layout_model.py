@@ -0,0 +1,117 @@
+import json
+
+# Plain-data description of a decal sheet. IconGridApp snapshots its cells
+# into a Layout, and the exporters only ever read Layouts, so sheets can be
+# rendered without Tk (see export_cli.py).
+SECTIONS = ["Left Shoulder", "Right Shoulder", "Gothic Numerals", "Imperial Numerals"]
+ICON_SECTIONS = SECTIONS[:2]
+GRID_ROWS = 5
+GRID_COLUMNS = 10
+DEFAULT_COLOR = "#ffffff"
+DEFAULT_FONT = ("Arial", 10, "bold")
+
+
+class CellData:
+    # Same attribute names GridCell exposes, so exporters accept either
+    def __init__(self, text=None, font=None, tint=DEFAULT_COLOR, icon_path=None):
+        self.content = text
+        self.font = tuple(font) if font else DEFAULT_FONT
+        self.tint = tint
+        self.icon_path = icon_path
+
+    @property
+    def is_text(self):
+        return isinstance(self.content, str)
+
+    @property
+    def is_empty(self):
+        return not self.is_text and not self.icon_path
+
+    @classmethod
+    def from_cell(cls, cell):
+        text = cell.content if isinstance(cell.content, str) else None
+        icon_path = None if text is not None else getattr(cell, "icon_path", None)
+        return cls(text=text, font=getattr(cell, "font", None),
+                   tint=getattr(cell, "tint", None) or DEFAULT_COLOR, icon_path=icon_path)
+
+    def to_dict(self):
+        if self.is_text:
+            return {"text": self.content, "font": list(self.font), "color": self.tint}
+        if self.icon_path:
+            return {"icon_file": self.icon_path, "color": self.tint}
+        return {}
+
+    @classmethod
+    def from_dict(cls, data):
+        font = data.get("font")
+        if isinstance(font, str):
+            font = (font, 10)
+        return cls(text=data.get("text"), font=font, tint=data.get("color") or DEFAULT_COLOR,
+                   icon_path=data.get("icon_file"))
+
+    def __eq__(self, other):
+        return isinstance(other, CellData) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"CellData({self.to_dict()})"
+
+
+class Layout:
+    def __init__(self, sections=None):
+        # section -> {(row, col): CellData}
+        self.sections = {section: {} for section in SECTIONS}
+        for section, cells in (sections or {}).items():
+            self.sections.setdefault(section, {}).update(cells)
+
+    def __getitem__(self, section):
+        return self.sections[section]
+
+    def cell(self, section, row, col):
+        cells = self.sections.setdefault(section, {})
+        if (row, col) not in cells:
+            cells[(row, col)] = CellData()
+        return cells[(row, col)]
+
+    def set_cell(self, section, row, col, cell):
+        self.sections.setdefault(section, {})[(row, col)] = cell
+
+    def icon_paths(self):
+        return sorted({cell.icon_path for cells in self.sections.values()
+                       for cell in cells.values() if not cell.is_text and cell.icon_path})
+
+    @classmethod
+    def from_grid_cells(cls, grid_cells):
+        # Snapshot of the live grid cells; safe to hand to another thread
+        return cls({
+            section: {pos: CellData.from_cell(cell) for pos, cell in cells.items()}
+            for section, cells in grid_cells.items()
+        })
+
+    def to_dict(self):
+        data = {}
+        for section, cells in self.sections.items():
+            data[section] = {}
+            for (row, col), cell in sorted(cells.items()):
+                cell_data = cell.to_dict()
+                if cell_data:
+                    data[section][f"{row},{col}"] = cell_data
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        sections = {}
+        for section, cells in data.items():
+            sections[section] = {}
+            for coord, cell_data in cells.items():
+                row, col = map(int, coord.split(","))
+                sections[section][(row, col)] = CellData.from_dict(cell_data)
+        return cls(sections)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
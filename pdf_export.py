@@ -0,0 +1,139 @@
+import math
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import A5, A4, A3, landscape
+from reportlab.lib.units import mm
+from export_helpers import draw_icon_form, attach_form_resources
+from content_hash import bytes_hash
+from font_registry import resolve_pdf_font
+from layout_model import SECTIONS
+from sheet_geometry import HALF_A4, sheet_geometry
+
+# Tk-free PDF rendering of a Layout; preview_window and export_cli both call in here.
+
+# One half-A4 decal sheet; multi-up pages stamp it as a single form
+SHEET_SIZE = HALF_A4.size
+PAGE_SIZES = {
+    "a4": A4,
+    "a3": A3,
+    "sra3": (320 * mm, 450 * mm),
+}
+
+def clamp_whites(hex_color, threshold="#FDFFF5"):
+    def hex_to_rgb(hex_code):
+        hex_code = hex_code.lstrip("#")
+        return tuple(int(hex_code[i:i+2], 16) for i in (0, 2, 4))
+
+    r, g, b = hex_to_rgb(hex_color)
+    tr, tg, tb = hex_to_rgb(threshold)
+
+    if r >= tr and g >= tg and b >= tb:
+        return threshold.upper()
+    return hex_color.upper()
+
+def cell_count(layout):
+    return sum(len(layout[section]) for section in SECTIONS)
+
+def draw_half_sheet(c, layout, offset_y=0, progress=None):
+    # progress(done, total) is called after every cell; it may raise to abort
+    geometry = sheet_geometry()
+    font_size_pt = HALF_A4.font_size
+    icon_diameter = HALF_A4.icon_size
+    total = cell_count(layout) if progress else 0
+
+    for done, (cell, _, _, icon_x, icon_y, text_x, baseline) in enumerate(geometry.cells_of(layout), 1):
+        if isinstance(cell.content, str):
+            family = cell.font[0] if isinstance(cell.font, tuple) else None
+            safe_color = clamp_whites(cell.tint or "#000000")
+            c.setFillColor(safe_color)
+            c.setFont(resolve_pdf_font(family), font_size_pt)
+
+            c.drawCentredString(text_x, baseline + offset_y, cell.content)
+
+        elif cell.icon_path:
+            try:
+                safe_color = clamp_whites(cell.tint or "#000000")
+                draw_icon_form(c, cell.icon_path, safe_color, icon_x, icon_y + offset_y, icon_diameter, icon_diameter)
+            except Exception as e:
+                print(f"[ERROR] Could not embed icon in PDF: {e}")
+
+        if progress:
+            progress(done, total)
+
+def sheet_form(c, layout, progress=None):
+    # The whole half-sheet (icons, text, fonts) is captured once per document
+    forms = getattr(c, "_sheet_forms", None)
+    if forms is None:
+        forms = c._sheet_forms = {}
+    name = forms.get(id(layout))
+    if name is None:
+        name = "sheet_" + bytes_hash(repr(layout.to_dict()).encode("utf-8"))[:16]
+        c.beginForm(name, lowerx=0, lowery=0, upperx=SHEET_SIZE[0], uppery=SHEET_SIZE[1])
+        draw_half_sheet(c, layout, progress=progress)
+        c.endForm()
+        attach_form_resources(c, name)
+        forms[id(layout)] = name
+    return name
+
+def imposition_slots(pagesize, n_up):
+    # Lower-left corners of n_up sheets, row by row from the top, centered on
+    # the page. Sheets are never scaled; they are turned 90 degrees if only
+    # that orientation fits.
+    page_w, page_h = pagesize
+    for rotated in (False, True):
+        w, h = (SHEET_SIZE[1], SHEET_SIZE[0]) if rotated else SHEET_SIZE
+        cols = int(page_w / w + 1e-6)
+        rows = int(page_h / h + 1e-6)
+        if cols * rows < n_up or not cols:
+            continue
+        cols = min(cols, n_up)
+        rows = math.ceil(n_up / cols)
+        x0 = (page_w - cols * w) / 2
+        y_top = (page_h + rows * h) / 2
+        return [
+            (x0 + (i % cols) * w, y_top - (i // cols + 1) * h, rotated)
+            for i in range(n_up)
+        ]
+    raise ValueError(f"{n_up} half-A4 sheets do not fit on a {page_w / mm:.0f}x{page_h / mm:.0f}mm page")
+
+def export_imposed_pdf(layout, path, page="a4", n_up=2, progress=None):
+    pagesize = PAGE_SIZES[page] if isinstance(page, str) else page
+    slots = imposition_slots(pagesize, n_up)
+    c = canvas.Canvas(path, pagesize=pagesize)
+    name = sheet_form(c, layout, progress)
+    for x, y, rotated in slots:
+        c.saveState()
+        if rotated:
+            c.translate(x + SHEET_SIZE[1], y)
+            c.rotate(90)
+        else:
+            c.translate(x, y)
+        c.doForm(name)
+        c.restoreState()
+    c.showPage()
+    c.save()
+    return path
+
+def _export(layout, path, pagesize, progress=None):
+    c = canvas.Canvas(path, pagesize=pagesize)
+    draw_half_sheet(c, layout, progress=progress)
+    c.showPage()
+    c.save()
+    return path
+
+def export_a5_pdf(layout, path, progress=None):
+    return _export(layout, path, landscape(A5), progress)
+
+def export_half_a4_pdf(layout, path, progress=None):
+    return _export(layout, path, A4, progress)
+
+def export_full_a4_pdf(layout, path, progress=None):
+    # The half-sheet is rendered once and stamped on both halves
+    return export_imposed_pdf(layout, path, "a4", 2, progress)
+
+EXPORT_FORMATS = {
+    "a5": export_a5_pdf,
+    "half-a4": export_half_a4_pdf,
+    "full-a4": export_full_a4_pdf,
+    "a3-4up": lambda layout, path, progress=None: export_imposed_pdf(layout, path, "a3", 4, progress),
+    "sra3-4up": lambda layout, path, progress=None: export_imposed_pdf(layout, path, "sra3", 4, progress),
+}
@@ -0,0 +1,171 @@
+from functools import lru_cache
+from PIL import Image, ImageDraw
+import raster_cache
+from font_registry import pil_font
+from pdf_export import clamp_whites
+from sheet_geometry import HALF_A4, pixel_geometry, fit_sheet
+
+# Composes the whole preview off-screen into one RGBA image, so the preview
+# window shows a single PhotoImage instead of one canvas item per cell.
+# Cells come from sheet_geometry like the PDF, so the preview is the printed
+# half-sheet scaled to the window. Tk-free; the window only converts the
+# result with ImageTk.
+
+PREVIEW_SIZE = (900, 636)
+PREVIEW_PADDING = 8  # pixels between the sheet edge and the window
+CHECK_SIZE = 10
+CHECK_COLORS = ("#333333", "#222222")
+SHEET_OUTLINE = "#555555"
+MAX_TINTED = 256  # tinted icons a live preview keeps between edits
+
+
+@lru_cache(maxsize=4)
+def checker_tile():
+    # One 2x2 check block; the background is this tile repeated
+    tile = Image.new("RGBA", (CHECK_SIZE * 2, CHECK_SIZE * 2), CHECK_COLORS[1])
+    tile.paste(CHECK_COLORS[0], (0, 0, CHECK_SIZE, CHECK_SIZE))
+    tile.paste(CHECK_COLORS[0], (CHECK_SIZE, CHECK_SIZE, CHECK_SIZE * 2, CHECK_SIZE * 2))
+    return tile
+
+
+@lru_cache(maxsize=4)
+def background(size=PREVIEW_SIZE):
+    # Checkerboard with the sheet outline; cached, callers copy before drawing
+    tile = checker_tile()
+    board = Image.new("RGBA", size)
+    for y in range(0, size[1], tile.height):
+        for x in range(0, size[0], tile.width):
+            board.paste(tile, (x, y))
+    scale, left, top = fit_sheet(size, padding=PREVIEW_PADDING)
+    ImageDraw.Draw(board).rectangle(
+        (round(left) - 1, round(top) - 1, round(left + HALF_A4.width * scale), round(top + HALF_A4.height * scale)),
+        outline=SHEET_OUTLINE)
+    return board
+
+
+def preview_geometry(size=PREVIEW_SIZE):
+    return pixel_geometry(HALF_A4.name, *fit_sheet(size, padding=PREVIEW_PADDING))
+
+
+def _icon(path, size, tint, tinted):
+    # Pre-tinted from the shared alpha mask, once per (icon, size, tint)
+    key = (path, size, tint)
+    image = tinted.get(key)
+    if image is None:
+        image = tinted[key] = raster_cache.load_image(path, size=size, color=tint)
+    return image
+
+
+def _composite(image, icon, x, y):
+    # Older Pillow rejects negative offsets, which dirty-region repaints produce
+    left, top = max(0, -x), max(0, -y)
+    if left or top:
+        if left >= icon.width or top >= icon.height:
+            return
+        icon = icon.crop((left, top, icon.width, icon.height))
+    image.alpha_composite(icon, (x + left, y + top))
+
+
+def _text_font(cell, geometry):
+    family = cell.font[0] if isinstance(cell.font, tuple) else None
+    return pil_font(family, geometry.font_px)
+
+
+def cell_bounds(cell, geometry, icon_left, icon_top, text_x, baseline):
+    # Pixel box the cell paints into
+    if isinstance(cell.content, str):
+        left, top, right, bottom = _text_font(cell, geometry).getbbox(cell.content, anchor="ms")
+        return (text_x + left, baseline + top, text_x + right, baseline + bottom)
+    if cell.icon_path:
+        return (icon_left, icon_top, icon_left + geometry.icon_px, icon_top + geometry.icon_px)
+    return None
+
+
+def draw_cell(image, cell, geometry, icon_left, icon_top, text_x, baseline, tinted, draw=None):
+    # Same colors and placement as pdf_export.draw_half_sheet
+    color = clamp_whites(cell.tint or "#000000")
+    if isinstance(cell.content, str):
+        draw = draw or ImageDraw.Draw(image)
+        draw.text((text_x, baseline), cell.content, fill=color, font=_text_font(cell, geometry), anchor="ms")
+    elif cell.icon_path:
+        try:
+            size = (geometry.icon_px, geometry.icon_px)
+            _composite(image, _icon(cell.icon_path, size, color, tinted), icon_left, icon_top)
+        except Exception as e:
+            print(f"[ERROR] Failed to render icon: {e}")
+
+
+def compose_preview(layout, size=PREVIEW_SIZE):
+    image = background(size).copy()
+    draw = ImageDraw.Draw(image)
+    geometry = preview_geometry(size)
+    tinted = {}
+    for _, cell, icon_left, icon_top, text_x, baseline in geometry.cells_of(layout):
+        draw_cell(image, cell, geometry, icon_left, icon_top, text_x, baseline, tinted, draw)
+    return image
+
+
+def _union(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def _intersects(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+class PreviewCompositor:
+    # Keeps the composed preview and re-renders only the boxes edited cells
+    # touch. Neighbours overlapping a dirty box are redrawn into it, clipped,
+    # so cells whose ink crosses a box edge stay intact.
+    def __init__(self, layout, size=PREVIEW_SIZE):
+        self.layout = layout
+        self.size = size
+        self.geometry = preview_geometry(size)
+        self.image = compose_preview(layout, size)
+        self._tinted = {}
+        self._bounds = {}  # (section, row, col) -> painted box
+        for key, cell, *place in self.geometry.cells_of(layout):
+            self._bounds[key] = cell_bounds(cell, self.geometry, *place)
+
+    def update_cells(self, changes):
+        # changes: {(section, row, col): CellData}; returns the repainted boxes
+        if len(self._tinted) > MAX_TINTED:
+            self._tinted.clear()
+        boxes = []
+        for (section, r, c), cell in changes.items():
+            place = self.geometry.cell(section, r, c)
+            if place is None or self.layout[section].get((r, c)) == cell:
+                continue
+            self.layout.set_cell(section, r, c, cell)
+            new = cell_bounds(cell, self.geometry, *place)
+            box = _union(self._bounds.get((section, r, c)), new)
+            self._bounds[(section, r, c)] = new
+            if box is not None:
+                boxes.append(self._clip(box))
+        boxes = [box for box in boxes if box[0] < box[2] and box[1] < box[3]]
+        for box in boxes:
+            self._repaint(box)
+        return boxes
+
+    def _clip(self, box):
+        return (max(0, int(box[0])), max(0, int(box[1])),
+                min(self.size[0], int(box[2]) + 1), min(self.size[1], int(box[3]) + 1))
+
+    def _repaint(self, box):
+        region = background(self.size).crop(box)
+        draw = ImageDraw.Draw(region)
+        dx, dy = box[0], box[1]
+        for key, cell, icon_left, icon_top, text_x, baseline in self.geometry.cells_of(self.layout):
+            bounds = self._bounds.get(key)
+            if bounds is None or not _intersects(bounds, box):
+                continue
+            draw_cell(region, cell, self.geometry, icon_left - dx, icon_top - dy,
+                      text_x - dx, baseline - dy, self._tinted, draw)
+        self.image.paste(region, box[:2])
+
+    def region(self, box):
+        return self.image.crop(box)
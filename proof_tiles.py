@@ -0,0 +1,153 @@
+import math
+import threading
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw
+from image_cache import ImageCache, PROOF_TILE_BUDGET
+from layout_model import CellData
+from preview_render import CHECK_SIZE, PREVIEW_SIZE, PREVIEW_PADDING, MAX_TINTED, checker_tile, cell_bounds, draw_cell
+from sheet_geometry import HALF_A4, pixel_geometry, fit_sheet
+
+# Tile pyramid for the zoomable proof view. Level 0 is the sheet at the
+# preview's fit-to-window scale; every level doubles it, so level 3 is 800%
+# (about 860 DPI). Tiles are rendered on demand from sheet_geometry with the
+# same draw_cell the preview uses, and kept in a byte-budgeted LRU.
+TILE_SIZE = 256
+MAX_LEVEL = 3
+BASE_SCALE = fit_sheet(PREVIEW_SIZE, padding=PREVIEW_PADDING)[0]
+
+
+def level_scale(level):
+    return BASE_SCALE * (2 ** level)
+
+
+def level_size(level):
+    scale = level_scale(level)
+    return math.ceil(HALF_A4.width * scale), math.ceil(HALF_A4.height * scale)
+
+
+def tile_range(level):
+    width, height = level_size(level)
+    return math.ceil(width / TILE_SIZE), math.ceil(height / TILE_SIZE)
+
+
+@lru_cache(maxsize=1)
+def _checker_strip():
+    # One tile plus a check period, so any tile origin can be cropped from it
+    span = TILE_SIZE + CHECK_SIZE * 2
+    tile = checker_tile()
+    board = Image.new("RGBA", (span, span))
+    for y in range(0, span, tile.height):
+        for x in range(0, span, tile.width):
+            board.paste(tile, (x, y))
+    return board
+
+
+def _tile_background(x0, y0):
+    period = CHECK_SIZE * 2
+    ox, oy = x0 % period, y0 % period
+    return _checker_strip().crop((ox, oy, ox + TILE_SIZE, oy + TILE_SIZE))
+
+
+class ProofRenderer:
+    # Safe to call render_tile from worker threads; update_cells runs on the
+    # Tk thread and swaps in a new snapshot of the edited cells
+    def __init__(self, layout):
+        self.layout = layout
+        self.cache = ImageCache(PROOF_TILE_BUDGET, "proof tiles")
+        self._lock = threading.Lock()  # layout, bounds, versions and FreeType text drawing
+        self._tinted = {}
+        self._bounds = {}  # level -> (cells, 4) painted boxes, built on first use
+        self.version = 0  # bumped by every edit; tiles from older versions are not cached
+
+    def _level_bounds(self, level, geometry):
+        # Painted box of every template cell, so text wider than its cell is
+        # drawn into every tile it reaches. Caller holds _lock.
+        bounds = self._bounds.get(level)
+        if bounds is None:
+            bounds = self._bounds[level] = np.tile([np.inf, np.inf, -np.inf, -np.inf], (len(geometry.cells), 1))
+            index = geometry.geometry.index
+            for key, cell, *place in geometry.cells_of(self.layout):
+                box = cell_bounds(cell, geometry, *place)
+                if box is not None:
+                    bounds[index[key]] = box
+        return bounds
+
+    def _cells_in(self, level, geometry, box):
+        g = geometry.geometry
+        with self._lock:
+            layout = self.layout
+            b = self._level_bounds(level, geometry)
+            hit = np.nonzero((b[:, 0] < box[2]) & (b[:, 2] > box[0]) &
+                             (b[:, 1] < box[3]) & (b[:, 3] > box[1]))[0]
+        sections = g.template.sections
+        for i in hit.tolist():
+            cell = layout[sections[g.section[i]]].get((int(g.row[i]), int(g.col[i])))
+            if cell is not None and not cell.is_empty:
+                yield cell, geometry.cells[i]
+
+    def render_tile(self, level, tx, ty):
+        key = (level, tx, ty)
+        tile = self.cache.get(key)
+        if tile is not None:
+            return tile
+        version = self.version
+
+        geometry = pixel_geometry(HALF_A4.name, level_scale(level))
+        x0, y0 = tx * TILE_SIZE, ty * TILE_SIZE
+        tile = _tile_background(x0, y0)
+        draw = ImageDraw.Draw(tile)
+        for cell, (icon_left, icon_top, text_x, baseline) in self._cells_in(
+                level, geometry, (x0, y0, x0 + TILE_SIZE, y0 + TILE_SIZE)):
+            place = (icon_left - x0, icon_top - y0, text_x - x0, baseline - y0)
+            if cell.is_text:
+                with self._lock:
+                    draw_cell(tile, cell, geometry, *place, self._tinted, draw)
+            else:
+                draw_cell(tile, cell, geometry, *place, self._tinted, draw)
+        # Checked and stored under the lock update_cells bumps and discards under,
+        # so a tile drawn before an edit can never be cached after it
+        with self._lock:
+            if version == self.version:
+                self.cache.put(key, tile)
+        return tile
+
+    def cached_tile(self, level, tx, ty):
+        return self.cache.get((level, tx, ty))
+
+    def update_cells(self, changes):
+        # changes: {(section, row, col): CellData}. Drops the cached tiles
+        # the old or new content touches; returns {level: {(tx, ty), ...}}.
+        stale = {}
+        with self._lock:
+            sections = {section: dict(cells) for section, cells in self.layout.sections.items()}
+            old_layout = self.layout
+            for (section, r, c), cell in changes.items():
+                sections.setdefault(section, {})[(r, c)] = cell
+            self.layout = type(old_layout)(sections)
+            self.version += 1
+            if len(self._tinted) > MAX_TINTED:
+                self._tinted.clear()
+
+            for level in range(MAX_LEVEL + 1):
+                geometry = pixel_geometry(HALF_A4.name, level_scale(level))
+                bounds = self._bounds.get(level)
+                tiles = stale[level] = set()
+                for (section, r, c), cell in changes.items():
+                    place = geometry.cell(section, r, c)
+                    if place is None:
+                        continue
+                    old = old_layout[section].get((r, c)) or CellData()
+                    new_box = cell_bounds(cell, geometry, *place)
+                    if bounds is not None:
+                        i = geometry.geometry.index[(section, r, c)]
+                        bounds[i] = new_box if new_box is not None else (np.inf, np.inf, -np.inf, -np.inf)
+                    for box in (cell_bounds(old, geometry, *place), new_box):
+                        if box is None:
+                            continue
+                        for ty in range(max(0, int(box[1]) // TILE_SIZE), int(box[3]) // TILE_SIZE + 1):
+                            for tx in range(max(0, int(box[0]) // TILE_SIZE), int(box[2]) // TILE_SIZE + 1):
+                                tiles.add((tx, ty))
+                for tx, ty in tiles:
+                    self.cache.discard((level, tx, ty))
+        return stale
@@ -0,0 +1,265 @@
+import itertools
+import os
+import queue
+import threading
+import time
+import tkinter as tk
+from PIL import Image, ImageTk
+from globals import COLOR_BG
+from layout_model import Layout, CellData
+from proof_tiles import ProofRenderer, TILE_SIZE, MAX_LEVEL, level_size, tile_range
+
+# Zoomable proof of the sheet, 100% to 800%. The canvas only holds the tiles
+# in view; missing ones render on worker threads, nearest the center first,
+# and show the upscaled parent tile until they arrive.
+
+POLL_MS = 15
+PUMP_BUDGET_S = 0.008  # PhotoImage creation per tick, like render_service
+MAX_WORKERS = 3
+KEEP_MARGIN = 1  # tiles kept on the canvas around the view while panning
+
+
+class ProofWindow(tk.Toplevel):
+    def __init__(self, app, layout, grid_cells=None):
+        super().__init__(app)
+        self.title("Proof")
+        self.configure(bg=COLOR_BG)
+        self.geometry("900x680")
+        self.grid_cells = grid_cells
+        self.renderer = ProofRenderer(layout)
+        self.level = 0
+        self._items = {}  # (tx, ty) -> [canvas item, PhotoImage, exact]
+        self._pending = set()  # (level, tx, ty) queued or rendering
+        self._generation = 0  # bumped on zoom; workers skip older requests
+        self._seq = itertools.count()
+        self._requests = queue.PriorityQueue()
+        self._results = queue.Queue()
+        self._refresh_after = None
+        self._pump_after = None
+        self._stopped = False
+
+        toolbar = tk.Frame(self, bg="#222")
+        toolbar.pack(side="top", fill="x")
+        for text, command in (("−", self.zoom_out), ("+", self.zoom_in), ("Fit", lambda: self.set_level(0))):
+            tk.Button(toolbar, text=text, command=command, bg="#444", fg="white",
+                      relief="flat", padx=10, pady=5).pack(side="left", padx=(10, 0), pady=5)
+        self.zoom_label = tk.Label(toolbar, text="", bg="#222", fg="#888888")
+        self.zoom_label.pack(side="left", padx=10)
+
+        body = tk.Frame(self, bg=COLOR_BG)
+        body.pack(side="top", fill="both", expand=True)
+        self.canvas = tk.Canvas(body, bg="#222222", highlightthickness=0)
+        xbar = tk.Scrollbar(body, orient="horizontal", command=self.canvas.xview)
+        ybar = tk.Scrollbar(body, orient="vertical", command=self.canvas.yview)
+        # Every scroll, drag or resize ends up in a *scrollcommand
+        self.canvas.config(xscrollcommand=self._on_scroll(xbar), yscrollcommand=self._on_scroll(ybar))
+        xbar.pack(side="bottom", fill="x")
+        ybar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<ButtonPress-1>", lambda e: self.canvas.scan_mark(e.x, e.y))
+        self.canvas.bind("<B1-Motion>", lambda e: self.canvas.scan_dragto(e.x, e.y, gain=1))
+        self.canvas.bind("<MouseWheel>", lambda e: self._wheel(e, 1 if e.delta > 0 else -1))
+        self.canvas.bind("<Button-4>", lambda e: self._wheel(e, 1))
+        self.canvas.bind("<Button-5>", lambda e: self._wheel(e, -1))
+        self.bind("<Configure>", lambda e: self._schedule_refresh())
+
+        worker_count = min(MAX_WORKERS, os.cpu_count() or 1)
+        for i in range(worker_count):
+            threading.Thread(target=self._work, daemon=True, name=f"proof-tile-{i}").start()
+        self.set_level(0)
+
+    # -- zoom and view ---------------------------------------------------
+
+    def zoom_in(self):
+        self.set_level(self.level + 1)
+
+    def zoom_out(self):
+        self.set_level(self.level - 1)
+
+    def _wheel(self, event, step):
+        self.set_level(self.level + step, (event.x, event.y))
+
+    def set_level(self, level, anchor=None):
+        # anchor: window pixel that stays over the same spot of the sheet
+        level = max(0, min(MAX_LEVEL, level))
+        if level == self.level and self._items:
+            return
+        if anchor is None:
+            anchor = (self.canvas.winfo_width() / 2, self.canvas.winfo_height() / 2)
+        factor = 2 ** (level - self.level)
+        sheet_x = (self.canvas.canvasx(anchor[0])) * factor
+        sheet_y = (self.canvas.canvasy(anchor[1])) * factor
+
+        self.level = level
+        self._generation += 1
+        self.canvas.delete("tile")
+        self._items.clear()
+        width, height = level_size(level)
+        self.canvas.config(scrollregion=(0, 0, width, height))
+        self.canvas.xview_moveto(max(0.0, sheet_x - anchor[0]) / width)
+        self.canvas.yview_moveto(max(0.0, sheet_y - anchor[1]) / height)
+        self.zoom_label.config(text=f"{100 * 2 ** level}%")
+        self._refresh()
+
+    def _on_scroll(self, scrollbar):
+        def command(first, last):
+            scrollbar.set(first, last)
+            self._schedule_refresh()
+        return command
+
+    def _schedule_refresh(self):
+        if self._refresh_after is None and not self._stopped:
+            self._refresh_after = self.after_idle(self._refresh)
+
+    def _visible_tiles(self, margin=0):
+        columns, rows = tile_range(self.level)
+        left = int(self.canvas.canvasx(0)) // TILE_SIZE - margin
+        top = int(self.canvas.canvasy(0)) // TILE_SIZE - margin
+        right = int(self.canvas.canvasx(self.canvas.winfo_width())) // TILE_SIZE + margin
+        bottom = int(self.canvas.canvasy(self.canvas.winfo_height())) // TILE_SIZE + margin
+        return {(tx, ty) for ty in range(max(0, top), min(rows, bottom + 1))
+                for tx in range(max(0, left), min(columns, right + 1))}
+
+    def _refresh(self):
+        self._refresh_after = None
+        if self._stopped:
+            return
+        visible = self._visible_tiles()
+        kept = self._visible_tiles(KEEP_MARGIN)
+        for key in [key for key in self._items if key not in kept]:
+            self.canvas.delete(self._items.pop(key)[0])
+
+        center_x = self.canvas.canvasx(self.canvas.winfo_width() / 2) / TILE_SIZE
+        center_y = self.canvas.canvasy(self.canvas.winfo_height() / 2) / TILE_SIZE
+        for tx, ty in visible:
+            shown = self._items.get((tx, ty))
+            if shown is not None and shown[2]:
+                continue
+            tile = self.renderer.cached_tile(self.level, tx, ty)
+            if tile is not None:
+                self._show(tx, ty, tile, exact=True)
+                continue
+            if shown is None:
+                placeholder = self._placeholder(self.level, tx, ty)
+                if placeholder is not None:
+                    self._show(tx, ty, placeholder, exact=False)
+            distance = (tx + 0.5 - center_x) ** 2 + (ty + 0.5 - center_y) ** 2
+            self._request(tx, ty, distance)
+
+    def _placeholder(self, level, tx, ty):
+        # Nearest cached ancestor, cropped and upscaled to this tile
+        for up in range(1, level + 1):
+            parent = self.renderer.cached_tile(level - up, tx >> up, ty >> up)
+            if parent is None:
+                continue
+            span = TILE_SIZE >> up
+            x = (tx % (1 << up)) * span
+            y = (ty % (1 << up)) * span
+            return parent.crop((x, y, x + span, y + span)).resize((TILE_SIZE, TILE_SIZE), Image.BILINEAR)
+        return None
+
+    def _show(self, tx, ty, image, exact):
+        photo = ImageTk.PhotoImage(image)
+        shown = self._items.get((tx, ty))
+        if shown is None:
+            item = self.canvas.create_image(tx * TILE_SIZE, ty * TILE_SIZE, anchor="nw", image=photo, tags="tile")
+            self._items[(tx, ty)] = [item, photo, exact]
+        else:
+            self.canvas.itemconfig(shown[0], image=photo)
+            shown[1], shown[2] = photo, exact
+
+    # -- background rendering --------------------------------------------
+
+    def _request(self, tx, ty, priority):
+        key = (self.level, tx, ty)
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        self._requests.put((priority, next(self._seq), self._generation, key))
+        self._ensure_pump()
+
+    def _work(self):
+        while True:
+            _, _, generation, key = self._requests.get()
+            if key is None or self._stopped:
+                return
+            if generation != self._generation:
+                self._results.put((key, None, None, None))  # zoomed away; just clear pending
+                continue
+            version = self.renderer.version
+            try:
+                self._results.put((key, version, self.renderer.render_tile(*key), None))
+            except Exception as e:
+                self._results.put((key, version, None, e))
+
+    def _ensure_pump(self):
+        if self._pump_after is None and not self._stopped:
+            self._pump_after = self.after(POLL_MS, self._pump)
+
+    def _pump(self):
+        self._pump_after = None
+        if self._stopped:
+            return
+        deadline = time.perf_counter() + PUMP_BUDGET_S
+        while time.perf_counter() < deadline:
+            try:
+                key, version, tile, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(key)
+            if error:
+                print(f"[ERROR] Failed to render proof tile {key}: {error}")
+                continue
+            level, tx, ty = key
+            if tile is None or level != self.level or (tx, ty) not in self._items and \
+                    (tx, ty) not in self._visible_tiles():
+                continue
+            # A tile rendered across an edit is shown but asked for again
+            fresh = version == self.renderer.version
+            self._show(tx, ty, tile, exact=fresh)
+            if not fresh:
+                self._schedule_refresh()
+        if self._pending or not self._results.empty():
+            self._ensure_pump()
+
+    # -- live edits ------------------------------------------------------
+
+    def cells_changed(self, changed):
+        changes = {
+            (section, r, c): CellData.from_cell(self.grid_cells[section][(r, c)])
+            for section, r, c in changed
+        }
+        stale = self.renderer.update_cells(changes).get(self.level, ())
+        # Old pixels stay up as the placeholder until the new tile lands
+        for key in stale:
+            shown = self._items.get(key)
+            if shown is not None:
+                shown[2] = False
+        self._schedule_refresh()
+
+    def destroy(self):
+        self._stopped = True
+        self._generation += 1
+        for _ in range(MAX_WORKERS):
+            self._requests.put((-1, next(self._seq), None, None))
+        for after_id in (self._refresh_after, self._pump_after):
+            if after_id:
+                self.after_cancel(after_id)
+        super().destroy()
+
+
+def open_proof_window(app):
+    # One proof per app; opening it again just raises the window
+    existing = getattr(app, "_proof_win", None)
+    if existing is not None and existing.winfo_exists():
+        existing.deiconify()
+        existing.lift()
+        return existing
+
+    grid_cells = app.grid_cells
+    proof = app._proof_win = ProofWindow(app, Layout.from_grid_cells(grid_cells), grid_cells)
+    if hasattr(app, "add_cell_listener"):
+        app.add_cell_listener(proof.cells_changed)
+        proof.bind("<Destroy>", lambda e: e.widget is proof and app.remove_cell_listener(proof.cells_changed))
+    return proof
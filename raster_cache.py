@@ -0,0 +1,102 @@
+import io
+import os
+import threading
+from PIL import Image, ImageColor
+import cairosvg
+from content_hash import file_hash
+from image_cache import ImageCache, MASK_CACHE_BUDGET
+import icon_atlas
+
+# Content-addressed PNG cache shared by every SVG rasterization path.
+# Rasters are stored untinted, keyed on the SVG content hash and output size,
+# so editing an icon on disk produces a new key instead of a stale image.
+# Tinting happens afterwards on the cached alpha mask and never re-rasterizes.
+CACHE_DIR = os.path.join("cache", "raster")
+
+# (content hash, size) -> "L" alpha mask
+MASK_CACHE = ImageCache(MASK_CACHE_BUDGET, "masks")
+
+
+def cache_path(svg_path, size):
+    digest = file_hash(svg_path)
+    name = f"{digest}_{size[0]}x{size[1]}.png"
+    return os.path.join(CACHE_DIR, digest[:2], name)
+
+
+def tint_mask(mask, color):
+    r, g, b, a = ImageColor.getcolor(color, "RGBA")
+    if a < 255:
+        mask = mask.point(lambda p: p * a // 255)
+    image = Image.new("RGBA", mask.size, (r, g, b, 255))
+    image.putalpha(mask)
+    return image
+
+
+def tint_image(image, color):
+    return tint_mask(image.convert("RGBA").getchannel("A"), color)
+
+
+def rasterize(svg_path, size):
+    with open(svg_path, "rb") as f:
+        svg_data = f.read()
+    return cairosvg.svg2png(bytestring=svg_data, output_width=size[0], output_height=size[1])
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Unique per thread: render workers and the atlas builder can write the same raster
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_png_bytes(svg_path, size=(40, 40)):
+    path = cache_path(svg_path, size)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        pass
+
+    png_data = rasterize(svg_path, size)
+    try:
+        _write_atomic(path, png_data)
+    except OSError as e:
+        print(f"[WARN] Could not write raster cache entry {path}: {e}")
+    return png_data
+
+
+def _decode_mask(png_data):
+    return Image.open(io.BytesIO(png_data)).convert("RGBA").getchannel("A")
+
+
+def has_mask(digest, size):
+    return (digest, size) in MASK_CACHE
+
+
+def remember_png(digest, size, png_data):
+    MASK_CACHE.put((digest, size), _decode_mask(png_data))
+
+
+def _load_raw(svg_path, size):
+    # Atlas slot first, then the PNG cache, then cairosvg
+    image = icon_atlas.lookup(file_hash(svg_path), size)
+    if image is None:
+        image = Image.open(io.BytesIO(load_png_bytes(svg_path, size))).convert("RGBA")
+    return image
+
+
+def load_mask(svg_path, size=(40, 40)):
+    key = (file_hash(svg_path), size)
+    mask = MASK_CACHE.get(key)
+    if mask is None:
+        mask = _load_raw(svg_path, size).getchannel("A")
+        MASK_CACHE.put(key, mask)
+    return mask
+
+
+def load_image(svg_path, size=(40, 40), color=None):
+    if color:
+        return tint_mask(load_mask(svg_path, size), color)
+    return _load_raw(svg_path, size)
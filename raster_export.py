@@ -0,0 +1,390 @@
+import hashlib
+import json
+import os
+import struct
+import zlib
+import numpy as np
+from PIL import Image, ImageColor, ImageDraw
+from reportlab.lib.pagesizes import A5, A4, landscape
+import raster_cache
+from font_registry import pil_font
+from export_cache import CACHE_VERSION, section_key
+from pdf_export import clamp_whites
+from sheet_geometry import HALF_A4, pixel_geometry
+
+# Raster (PNG/TIFF) export for printers that do not take PDF. Uses the same
+# sheet_geometry cells as pdf_export.draw_half_sheet, scaled to pixels.
+# Every unique icon is rasterized once at the target DPI and every unique
+# text run is drawn once; the page is then composited in horizontal tiles
+# with NumPy and each tile is compressed straight to disk, so a 1200 DPI A4
+# never holds the full page in memory. Given a section cache, each section's
+# band is rendered once into a memory-mapped file and reused while that
+# section is unchanged.
+#   export_raster(layout, "sheet.png", page="full-a4", dpi=600)
+
+RASTER_DPIS = (300, 600, 1200)
+# page -> (page size in points, half-sheet offsets), matching the PDF formats
+RASTER_PAGES = {
+    "a5": (landscape(A5), (0,)),
+    "half-a4": (A4, (0,)),
+    "full-a4": (A4, (0, A4[1] / 2)),
+}
+RASTER_EXTENSIONS = {".png": "png", ".tif": "tiff", ".tiff": "tiff"}
+TILE_BYTES = 16 * 1024 * 1024
+STRIP_ROWS = 64
+BACKGROUND = (255, 255, 255)
+
+
+class _Sprite:
+    # Coverage (0..1 float32) and flat color, placed at a pixel position
+    def __init__(self, alpha, rgb, left, top):
+        self.alpha = alpha
+        self.rgb = rgb
+        self.left = left
+        self.top = top
+        self.bottom = top + alpha.shape[0]
+        self.right = left + alpha.shape[1]
+
+
+def _text_alpha(text, font):
+    left, top, right, bottom = font.getbbox(text, anchor="ls")
+    if right <= left or bottom <= top:
+        return None, 0, 0
+    mask = Image.new("L", (right - left, bottom - top), 0)
+    ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font, anchor="ls")
+    return np.asarray(mask, dtype=np.float32) / 255.0, left, top
+
+
+def _rgb(color):
+    return np.array(ImageColor.getrgb(color)[:3], dtype=np.float32)
+
+
+class _SpriteFactory:
+    # Coverage masks and colors shared by every sheet and section of one export
+    def __init__(self):
+        self.icon_alphas = {}  # icon path -> coverage at icon_px
+        self.text_alphas = {}  # (text, family, font_px) -> (coverage, bbox left, bbox top, advance)
+        self.colors = {}
+
+    def sprites(self, layout, geometry, sections=None):
+        icon_px, font_px = geometry.icon_px, geometry.font_px
+        sprites = []
+        for (section, _, _), cell, icon_left, icon_top, text_x, baseline in geometry.cells_of(layout):
+            if sections is not None and section not in sections:
+                continue
+            color = clamp_whites(cell.tint or "#000000")
+            rgb = self.colors.get(color)
+            if rgb is None:
+                rgb = self.colors[color] = _rgb(color)
+
+            if isinstance(cell.content, str):
+                family = cell.font[0] if isinstance(cell.font, tuple) else None
+                key = (cell.content, family, font_px)
+                entry = self.text_alphas.get(key)
+                if entry is None:
+                    font = pil_font(family, font_px)
+                    alpha, left, top = _text_alpha(cell.content, font)
+                    entry = self.text_alphas[key] = (alpha, left, top, font.getlength(cell.content))
+                alpha, left, top, advance = entry
+                if alpha is None:
+                    continue
+                # drawCentredString: centered on the advance width
+                origin_x = text_x - advance / 2
+                sprites.append(_Sprite(alpha, rgb, round(origin_x + left), round(baseline + top)))
+
+            elif cell.icon_path:
+                alpha = self.icon_alphas.get(cell.icon_path)
+                if alpha is None:
+                    try:
+                        mask = raster_cache.load_mask(cell.icon_path, (icon_px, icon_px))
+                    except Exception as e:
+                        print(f"[ERROR] Could not rasterize icon {cell.icon_path}: {e}")
+                        self.icon_alphas[cell.icon_path] = False
+                        continue
+                    alpha = self.icon_alphas[cell.icon_path] = np.asarray(mask, dtype=np.float32) / 255.0
+                if alpha is False:
+                    continue
+                sprites.append(_Sprite(alpha, rgb, icon_left, icon_top))
+        sprites.sort(key=lambda s: s.top)
+        return sprites
+
+
+def sheet_geometries(page="full-a4", dpi=300):
+    # One PixelGeometry per half-sheet on the page, top-left corner placed in pixels
+    page_size, offsets = RASTER_PAGES[page]
+    scale = dpi / 72.0
+    return [pixel_geometry(HALF_A4.name, scale, 0.0, (page_size[1] - offset_y - HALF_A4.height) * scale)
+            for offset_y in offsets]
+
+
+def build_sprites(layout, page="full-a4", dpi=300):
+    factory = _SpriteFactory()
+    sprites = []
+    for geometry in sheet_geometries(page, dpi):
+        sprites.extend(factory.sprites(layout, geometry))
+    sprites.sort(key=lambda s: s.top)
+    return sprites
+
+
+def _composite(tile, y0, sprites, width, transparent):
+    rows = tile.shape[0]
+    for sprite in sprites:
+        top, bottom = max(sprite.top, y0), min(sprite.bottom, y0 + rows)
+        left, right = max(sprite.left, 0), min(sprite.right, width)
+        if top >= bottom or left >= right:
+            continue
+        a = sprite.alpha[top - sprite.top:bottom - sprite.top, left - sprite.left:right - sprite.left, None]
+        region = tile[top - y0:bottom - y0, left:right]
+        dst = region.astype(np.float32)
+        if transparent:
+            dst_a = dst[..., 3:] / 255.0
+            out_a = a + dst_a * (1.0 - a)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rgb = (sprite.rgb * a + dst[..., :3] * dst_a * (1.0 - a)) / out_a
+            dst[..., :3] = np.where(out_a > 0, rgb, 0.0)
+            dst[..., 3:] = out_a * 255.0
+        else:
+            dst += (sprite.rgb - dst) * a
+        region[...] = np.rint(dst)
+
+
+class _PngWriter:
+    # Minimal streaming PNG encoder: rows go through one zlib stream as they arrive
+    def __init__(self, path, width, height, channels, dpi):
+        self.file = open(path, "wb")
+        self.compressor = zlib.compressobj(6)
+        color_type = 6 if channels == 4 else 2
+        self.file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+        ppm = round(dpi / 0.0254)
+        self._chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1))
+
+    def _chunk(self, kind, data):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write(self, rows):
+        scanlines = np.zeros((rows.shape[0], 1 + rows.shape[1] * rows.shape[2]), dtype=np.uint8)
+        scanlines[:, 1:] = rows.reshape(rows.shape[0], -1)  # filter type 0 per row
+        data = self.compressor.compress(scanlines.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+
+    def close(self):
+        self._chunk(b"IDAT", self.compressor.flush())
+        self._chunk(b"IEND", b"")
+        self.file.close()
+
+
+class _TiffWriter:
+    # Minimal streaming TIFF encoder: deflate-compressed strips, IFD written last
+    def __init__(self, path, width, height, channels, dpi):
+        self.file = open(path, "wb")
+        self.width = width
+        self.height = height
+        self.channels = channels
+        self.dpi = dpi
+        self.offsets = []
+        self.counts = []
+        self.pending = None
+        self.file.write(b"II*\x00\x00\x00\x00\x00")  # IFD offset patched in close()
+
+    def _write_strip(self, rows):
+        data = zlib.compress(rows.tobytes(), 6)
+        self.offsets.append(self.file.tell())
+        self.counts.append(len(data))
+        self.file.write(data)
+
+    def write(self, rows):
+        if self.pending is not None:
+            rows = np.concatenate((self.pending, rows))
+            self.pending = None
+        full = rows.shape[0] - rows.shape[0] % STRIP_ROWS
+        for start in range(0, full, STRIP_ROWS):
+            self._write_strip(rows[start:start + STRIP_ROWS])
+        if full < rows.shape[0]:
+            self.pending = rows[full:].copy()
+
+    def close(self):
+        if self.pending is not None:
+            self._write_strip(self.pending)
+        if self.file.tell() % 2:
+            self.file.write(b"\x00")
+
+        # (tag, type, values); type 3 = SHORT, 4 = LONG, 5 = RATIONAL
+        tags = [
+            (256, 4, [self.width]),
+            (257, 4, [self.height]),
+            (258, 3, [8] * self.channels),
+            (259, 3, [8]),  # Adobe deflate
+            (262, 3, [2]),  # RGB
+            (273, 4, self.offsets),
+            (277, 3, [self.channels]),
+            (278, 4, [STRIP_ROWS]),
+            (279, 4, self.counts),
+            (282, 5, [(self.dpi, 1)]),
+            (283, 5, [(self.dpi, 1)]),
+            (284, 3, [1]),
+            (296, 3, [2]),  # inches
+        ]
+        if self.channels == 4:
+            tags.append((338, 3, [2]))  # unassociated alpha
+
+        ifd_offset = self.file.tell()
+        extra_offset = ifd_offset + 2 + 12 * len(tags) + 4
+        entries = []
+        extra = b""
+        for tag, kind, values in tags:
+            if kind == 5:
+                data = b"".join(struct.pack("<II", n, d) for n, d in values)
+            else:
+                data = struct.pack(f"<{len(values)}{'H' if kind == 3 else 'I'}", *values)
+            if len(data) <= 4:
+                field = data.ljust(4, b"\x00")
+            else:
+                field = struct.pack("<I", extra_offset + len(extra))
+                extra += data
+                if len(extra) % 2:
+                    extra += b"\x00"
+            entries.append(struct.pack("<HHI", tag, kind, len(values)) + field)
+
+        self.file.write(struct.pack("<H", len(tags)) + b"".join(entries) + b"\x00\x00\x00\x00" + extra)
+        self.file.seek(4)
+        self.file.write(struct.pack("<I", ifd_offset))
+        self.file.close()
+
+
+def _band_key(layout, section, geometry, width, transparent):
+    # The band's pixels depend on the section's cells, the scale and where the
+    # sheet's top edge falls inside a pixel, never on the other sections
+    data = json.dumps({
+        "version": CACHE_VERSION,
+        "section": section,
+        "cells": section_key(layout, section),
+        "scale": round(geometry.scale, 9),
+        "phase": round(geometry.top % 1.0, 6),
+        "width": width,
+        "transparent": transparent,
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _load_band(path, shape):
+    try:
+        band = np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    return band if band.shape == shape and band.dtype == np.uint8 else None
+
+
+def _render_band(path, shape, top, sprites, background, transparent, tile_rows):
+    # Written in strips into a memory-mapped .npy, so a 1200 DPI band is never held in RAM
+    band = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=shape)
+    for y0 in range(0, shape[0], tile_rows):
+        strip = band[y0:y0 + tile_rows]
+        strip[...] = background
+        _composite(strip, top + y0, sprites, shape[1], transparent)
+    band.flush()
+    del band
+
+
+def _section_bands(layout, page, dpi, width, channels, background, transparent, tile_rows, cache):
+    # ([(top, bottom, band array)], sprites to composite directly). A section
+    # whose ink leaves its band can't be cached and is composited per tile.
+    bands = []
+    loose = []
+    factory = _SpriteFactory()
+    for geometry in sheet_geometries(page, dpi):
+        for section in HALF_A4.sections:
+            if not any(not cell.is_empty for cell in layout[section].values()):
+                continue
+            top, bottom = geometry.section_rows(section)
+            shape = (bottom - top, width, channels)
+            key = _band_key(layout, section, geometry, width, transparent)
+            hit = cache.get(key, ".npy")
+            band = _load_band(hit, shape) if hit else None
+            if band is None:
+                sprites = factory.sprites(layout, geometry, (section,))
+                failed = any(factory.icon_alphas.get(cell.icon_path) is False
+                             for cell in layout[section].values() if not cell.is_text)
+                # Missing icons aren't baked in, so a later fix to the file shows up
+                if failed or any(s.top < top or s.bottom > bottom for s in sprites):
+                    loose.extend(sprites)
+                    continue
+                tmp_path = cache.tmp_path(key, ".npy")
+                try:
+                    os.makedirs(cache.cache_dir, exist_ok=True)
+                    _render_band(tmp_path, shape, top, sprites, background, transparent, tile_rows)
+                except OSError as e:
+                    print(f"[WARN] Could not cache {section} band: {e}")
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                    loose.extend(sprites)
+                    continue
+                stored = cache.put(key, ".npy", tmp_path, move=True)
+                band = _load_band(stored, shape) if stored else None
+                if band is None:
+                    loose.extend(sprites)
+                    continue
+            bands.append((top, bottom, band))
+    loose.sort(key=lambda s: s.top)
+    return bands, loose
+
+
+def raster_size(page="full-a4", dpi=300):
+    page_w, page_h = RASTER_PAGES[page][0]
+    return round(page_w * dpi / 72.0), round(page_h * dpi / 72.0)
+
+
+def export_raster(layout, path, page="full-a4", dpi=300, transparent=False, tile_bytes=TILE_BYTES,
+                  progress=None, section_cache=None):
+    # progress(rows done, total rows) is called after every tile; it may raise to abort.
+    # With a section_cache (export_cache.SECTION_CACHE), sections reuse their
+    # rendered bands from earlier exports and only edited sections re-render.
+    kind = RASTER_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if kind is None:
+        raise ValueError(f"Unsupported raster format for {path} (use .png, .tif or .tiff)")
+    if page not in RASTER_PAGES:
+        raise ValueError(f"Raster export supports {', '.join(RASTER_PAGES)}, not {page}")
+
+    width, height = raster_size(page, dpi)
+    channels = 4 if transparent else 3
+    background = (0, 0, 0, 0) if transparent else BACKGROUND
+    tile_rows = max(STRIP_ROWS, tile_bytes // (width * channels) // STRIP_ROWS * STRIP_ROWS)
+    if section_cache is None:
+        bands, sprites = [], build_sprites(layout, page, dpi)
+    else:
+        bands, sprites = _section_bands(layout, page, dpi, width, channels, background, transparent,
+                                        tile_rows, section_cache)
+
+    writer = (_PngWriter if kind == "png" else _TiffWriter)(path, width, height, channels, dpi)
+    try:
+        first = 0
+        for y0 in range(0, height, tile_rows):
+            rows = min(tile_rows, height - y0)
+            tile = np.empty((rows, width, channels), dtype=np.uint8)
+            tile[...] = background
+            for top, bottom, band in bands:
+                a, b = max(top, y0), min(bottom, y0 + rows)
+                if a < b:
+                    tile[a - y0:b - y0] = band[a - top:b - top]
+            while first < len(sprites) and sprites[first].bottom <= y0:
+                first += 1
+            active = []
+            for sprite in sprites[first:]:
+                if sprite.top >= y0 + rows:
+                    break
+                active.append(sprite)
+            _composite(tile, y0, active, width, transparent)
+            writer.write(tile)
+            if progress:
+                progress(y0 + rows, height)
+    except BaseException:
+        writer.close()
+        os.remove(path)
+        raise
+    writer.close()
+    return path
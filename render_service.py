@@ -0,0 +1,183 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from PIL import ImageTk
+from globals import get_cached_icon
+from image_cache import ICON_CACHE
+import raster_cache
+
+# Lower value wins: cells on the sheet, then rows in the picker, then prefetch
+PRIORITY_GRID = 0
+PRIORITY_PICKER = 1
+PRIORITY_PREFETCH = 2
+
+POLL_MS = 15
+PUMP_BUDGET_S = 0.008  # PhotoImage creation per tick, keeps the Tk loop snappy
+MAX_WORKERS = 4
+
+
+def icon_key(path, size, color):
+    # Same key get_cached_icon uses, so both paths share ICON_CACHE entries
+    return (path, size, color)
+
+
+class RenderTicket:
+    def __init__(self, key, callback):
+        self.key = key
+        self.callback = callback
+        self.cancelled = False
+
+
+class RenderService:
+    # Rasterizes on worker threads into PIL buffers; only the Tk after() pump
+    # creates PhotoImages. Requests for the same key share one render, and a
+    # repeated request with a better priority jumps the queue.
+    def __init__(self, root, max_workers=None):
+        self.root = root
+        self._queue = queue.PriorityQueue()
+        self._results = queue.Queue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._waiting = {}  # key -> [RenderTicket]
+        self._best_priority = {}  # key -> best priority queued so far
+        self._running = set()  # keys a worker is rendering; new tickets just wait for it
+        self._stopped = False
+        self._after_id = None
+        worker_count = max_workers or min(MAX_WORKERS, os.cpu_count() or 1)
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True, name=f"icon-render-{i}")
+            for i in range(worker_count)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def request(self, path, size, color=None, callback=None, priority=PRIORITY_PICKER):
+        key = icon_key(path, size, color)
+        photo = ICON_CACHE.get(key)
+        if photo is not None:
+            if callback:
+                callback(photo)
+            return None
+
+        ticket = RenderTicket(key, callback)
+        with self._lock:
+            tickets = self._waiting.setdefault(key, [])
+            tickets.append(ticket)
+            best = self._best_priority.get(key)
+            # A key already rendering is never queued again; its result serves every ticket
+            if key not in self._running and (best is None or priority < best):
+                self._best_priority[key] = priority
+                self._queue.put((priority, next(self._seq), key))
+        self._ensure_pump()
+        return ticket
+
+    def cancel(self, ticket):
+        if ticket is None or ticket.cancelled:
+            return
+        ticket.cancelled = True
+        with self._lock:
+            tickets = self._waiting.get(ticket.key)
+            if tickets and ticket in tickets:
+                tickets.remove(ticket)
+
+    def stop(self):
+        self._stopped = True
+        for _ in self._workers:
+            self._queue.put((-1, next(self._seq), None))
+        if self._after_id:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _take(self, key):
+        # Drop the job if every requester went away (row scrolled off, etc.)
+        with self._lock:
+            if self._best_priority.pop(key, None) is None:
+                return False  # stale lower-priority duplicate of a taken job
+            if not self._waiting.get(key):
+                self._waiting.pop(key, None)
+                return False
+            self._running.add(key)
+            return True
+
+    def _work(self):
+        while True:
+            _, _, key = self._queue.get()
+            if key is None or self._stopped:
+                return
+            if not self._take(key):
+                continue
+            path, size, color = key
+            try:
+                image = raster_cache.load_image(path, size=size, color=color)
+                self._results.put((key, image, None))
+            except Exception as e:
+                self._results.put((key, None, e))
+
+    def _ensure_pump(self):
+        if self._after_id is None and not self._stopped:
+            self._after_id = self.root.after(POLL_MS, self._pump)
+
+    def _pump(self):
+        self._after_id = None
+        deadline = time.perf_counter() + PUMP_BUDGET_S
+        while time.perf_counter() < deadline:
+            try:
+                key, image, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            photo = None
+            if error:
+                print(f"[ERROR] Failed to render icon {key[0]}: {error}")
+            else:
+                # An entry cached meanwhile (and maybe pinned by cells) wins
+                photo = ICON_CACHE.get(key)
+                if photo is None:
+                    photo = ICON_CACHE.put(key, ImageTk.PhotoImage(image))
+            with self._lock:
+                self._running.discard(key)
+                tickets = self._waiting.pop(key, [])
+            for ticket in tickets:
+                if not ticket.cancelled and ticket.callback:
+                    ticket.callback(photo)
+
+        with self._lock:
+            busy = bool(self._waiting)
+        if busy or not self._results.empty():
+            self._ensure_pump()
+
+
+_service = None
+
+
+def start_render_service(root, max_workers=None):
+    global _service
+    if _service is None:
+        _service = RenderService(root, max_workers)
+    return _service
+
+
+def stop_render_service():
+    global _service
+    if _service is not None:
+        _service.stop()
+        _service = None
+
+
+def request_icon(path, size, color=None, callback=None, priority=PRIORITY_PICKER):
+    # Without a running service (legacy app, tools) render synchronously
+    if _service is not None:
+        return _service.request(path, size, color, callback, priority)
+    photo = get_cached_icon(path, size=size, color=color)
+    if callback:
+        callback(photo)
+    return None
+
+
+def cancel_request(ticket):
+    if _service is not None:
+        _service.cancel(ticket)
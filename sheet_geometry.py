@@ -0,0 +1,142 @@
+from functools import lru_cache
+import numpy as np
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from layout_model import SECTIONS, ICON_SECTIONS, GRID_ROWS, GRID_COLUMNS
+
+# Cell rectangles for a decal sheet, computed once per template for every
+# cell at the same time with NumPy. The PDF exporter reads them in points;
+# the raster exporter and the preview read the same rectangles scaled to
+# pixels, so the preview is the printed sheet, just smaller.
+
+
+class SheetTemplate:
+    def __init__(self, name, width, height, margin, icon_size, zigzag, font_size,
+                 sections=tuple(SECTIONS), icon_sections=tuple(ICON_SECTIONS), rows=GRID_ROWS, columns=GRID_COLUMNS):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.icon_size = icon_size
+        self.zigzag = zigzag  # odd icon rows shift left by this much
+        self.font_size = font_size
+        # Tuples: geometry is cached per template, so the template must not change
+        self.sections = tuple(sections)
+        self.icon_sections = tuple(icon_sections)
+        self.rows = rows
+        self.columns = columns
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+
+# The half-A4 decal sheet every export format prints
+HALF_A4 = SheetTemplate("half-a4", A4[0], A4[1] / 2, margin=5 * mm, icon_size=6 * mm,
+                        zigzag=10 * mm, font_size=int(3.7 * 2.835))
+TEMPLATES = {HALF_A4.name: HALF_A4}
+
+
+class SheetGeometry:
+    # Flat arrays over every (section, row, col) of the template, in points
+    # with the origin at the sheet's bottom-left corner like reportlab
+    def __init__(self, template):
+        t = self.template = template
+        n_sections = len(t.sections)
+        s, r, c = np.meshgrid(np.arange(n_sections), np.arange(t.rows), np.arange(t.columns), indexing="ij")
+        self.section = s.ravel()
+        self.row = r.ravel()
+        self.col = c.ravel()
+
+        section_h = (t.height - 2 * t.margin) / n_sections
+        self.cell_h = section_h / t.rows
+        self.cell_w = (t.width - 2 * t.margin) / t.columns
+        icon_rows = np.isin(self.section, [t.sections.index(name) for name in t.icon_sections])
+        shift = np.where(icon_rows & (self.row % 2 == 1), -t.zigzag, 0.0)
+
+        self.x = t.margin + shift + self.col * self.cell_w
+        self.y = t.margin + (n_sections - 1 - self.section) * section_h + (t.rows - 1 - self.row) * self.cell_h
+        self.icon_x = self.x + (self.cell_w - t.icon_size) / 2
+        self.icon_y = self.y + (self.cell_h - t.icon_size) / 2
+        self.text_x = self.x + self.cell_w / 2
+        self.baseline = self.y + self.cell_h / 2 - t.font_size / 4  # drawCentredString baseline
+
+        self.index = {
+            (t.sections[si], ri, ci): i
+            for i, (si, ri, ci) in enumerate(zip(self.section.tolist(), self.row.tolist(), self.col.tolist()))
+        }
+        # Plain floats for the per-cell draw loops; numpy scalars are slow there
+        self.cells = list(zip(self.x.tolist(), self.y.tolist(), self.icon_x.tolist(),
+                              self.icon_y.tolist(), self.text_x.tolist(), self.baseline.tolist()))
+
+    def cells_of(self, layout):
+        # Yields (cell, x, y, icon_x, icon_y, text_x, baseline) for every cell in the layout
+        for section in self.template.sections:
+            for (r, c), cell in layout[section].items():
+                i = self.index.get((section, r, c))
+                if i is not None:
+                    yield (cell,) + self.cells[i]
+
+
+class PixelGeometry:
+    # The same cells on a raster: the sheet scaled by `scale` px/pt with its
+    # top-left corner at (left, top) px. Boxes are integer pixels.
+    def __init__(self, geometry, scale, left=0.0, top=0.0):
+        t = geometry.template
+        self.geometry = geometry
+        self.scale = scale
+        self.left = left
+        self.top = top
+        self.icon_px = max(1, round(t.icon_size * scale))
+        self.font_px = max(1, round(t.font_size * scale))
+
+        flip = lambda y: top + (t.height - y) * scale
+        self.icon_left = np.rint(left + geometry.icon_x * scale).astype(int)
+        self.icon_top = np.rint(flip(geometry.icon_y + t.icon_size)).astype(int)
+        self.text_x = left + geometry.text_x * scale
+        self.baseline = flip(geometry.baseline)
+        self.cell_left = np.floor(left + geometry.x * scale).astype(int)
+        self.cell_top = np.floor(flip(geometry.y + geometry.cell_h)).astype(int)
+        self.cell_right = np.ceil(left + (geometry.x + geometry.cell_w) * scale).astype(int)
+        self.cell_bottom = np.ceil(flip(geometry.y)).astype(int)
+        self.cells = list(zip(self.icon_left.tolist(), self.icon_top.tolist(),
+                              self.text_x.tolist(), self.baseline.tolist()))
+
+    def cell(self, section, row, col):
+        # (icon_left, icon_top, text_x, baseline) or None outside the template
+        i = self.geometry.index.get((section, row, col))
+        return None if i is None else self.cells[i]
+
+    def section_rows(self, section):
+        # Pixel rows [top, bottom) of a section's band; neighbours share edges exactly
+        t = self.geometry.template
+        i = t.sections.index(section)
+        section_h = (t.height - 2 * t.margin) / len(t.sections)
+        edge = lambda k: int(np.rint(self.top + (t.margin + k * section_h) * self.scale))
+        return edge(i), edge(i + 1)
+
+    def cells_of(self, layout):
+        # Yields (key, cell, icon_left, icon_top, text_x, baseline)
+        index = self.geometry.index
+        for section in self.geometry.template.sections:
+            for (r, c), cell in layout[section].items():
+                i = index.get((section, r, c))
+                if i is not None:
+                    yield ((section, r, c), cell) + self.cells[i]
+
+
+@lru_cache(maxsize=8)
+def sheet_geometry(template=HALF_A4.name):
+    return SheetGeometry(TEMPLATES[template])
+
+
+@lru_cache(maxsize=32)
+def pixel_geometry(template=HALF_A4.name, scale=1.0, left=0.0, top=0.0):
+    return PixelGeometry(sheet_geometry(template), scale, left, top)
+
+
+def fit_sheet(size, template=HALF_A4.name, padding=0):
+    # (scale, left, top) that centers the sheet in a size=(w, h) pixel area
+    t = TEMPLATES[template]
+    scale = min((size[0] - 2 * padding) / t.width, (size[1] - 2 * padding) / t.height)
+    return scale, (size[0] - t.width * scale) / 2, (size[1] - t.height * scale) / 2
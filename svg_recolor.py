@@ -0,0 +1,86 @@
+import re
+from functools import lru_cache
+from lxml import etree
+from content_hash import file_hash
+
+# Recolors SVGs for the PDF exporter. Each file is parsed once into a
+# template: every paint value (fill, stroke, stop-color, color, in attributes,
+# inline styles and <style> blocks) is replaced by a slot marker and the tree
+# is serialized and split on it. A tinted variant is then a single join.
+# "none", "transparent" and url(#...) references stay as they are, so
+# outlines keep their strokes and gradients keep their opacity ramps while
+# their stops take the tint.
+_SLOT_MARK = "__grimdark_tint_slot__"
+
+PAINT_ATTRS = ("fill", "stroke", "stop-color", "color")
+_KEEP_VALUES = ("none", "transparent", "inherit")
+_STYLE_PAINT_RE = re.compile(r"(?<![\w-])(fill|stroke|stop-color|color)(\s*:\s*)([^;}\"']+)")
+
+TEMPLATE_CACHE_SIZE = 256
+TINT_CACHE_SIZE = 512
+
+
+def _is_paint(value):
+    value = value.strip()
+    if not value:
+        return False
+    lowered = value.lower()
+    return lowered not in _KEEP_VALUES and not lowered.startswith("url(")
+
+
+def _slot_style(style):
+    def replace(match):
+        prop, sep, value = match.groups()
+        trailing = value[len(value.rstrip()):]
+        if not _is_paint(value):
+            return match.group(0)
+        return f"{prop}{sep}{_SLOT_MARK}{trailing}"
+    return _STYLE_PAINT_RE.sub(replace, style)
+
+
+def build_template(svg_data):
+    parser = etree.XMLParser(remove_blank_text=False, resolve_entities=False, huge_tree=True)
+    root = etree.fromstring(svg_data, parser)
+
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue  # comments and processing instructions
+        for attr in PAINT_ATTRS:
+            value = element.get(attr)
+            if value is not None and _is_paint(value):
+                element.set(attr, _SLOT_MARK)
+        style = element.get("style")
+        if style:
+            element.set("style", _slot_style(style))
+        if etree.QName(element).localname == "style" and element.text:
+            element.text = _slot_style(element.text)
+
+    # Unpainted shapes default to black and currentColor follows "color";
+    # both resolve to the tint through inheritance from the root.
+    if root.get("fill") is None:
+        root.set("fill", _SLOT_MARK)
+    if root.get("color") is None:
+        root.set("color", _SLOT_MARK)
+
+    return tuple(etree.tostring(root, encoding="unicode").split(_SLOT_MARK))
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _template(digest, svg_path):
+    with open(svg_path, "rb") as f:
+        return build_template(f.read())
+
+
+@lru_cache(maxsize=TINT_CACHE_SIZE)
+def _tinted(digest, svg_path, color_hex):
+    return color_hex.join(_template(digest, svg_path))
+
+
+def tint_svg(svg_path, color_hex):
+    # Keyed on the content hash, so an edited icon is re-parsed automatically
+    return _tinted(file_hash(svg_path), svg_path, color_hex)
+
+
+def clear_caches():
+    _template.cache_clear()
+    _tinted.cache_clear()
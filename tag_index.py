@@ -0,0 +1,53 @@
+from collections import defaultdict
+
+# Pseudo-tag the picker shows for icons without any tags
+UNTAGGED = "Unknown"
+
+
+class TagIndex:
+    # Inverted index from tag to entry ids. Ids are positions in the entry list,
+    # which load_icon_entries returns already sorted, so sorting ids is enough
+    # to hand results back in a stable order.
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.all_ids = frozenset(range(len(self.entries)))
+        postings = defaultdict(set)
+        for i, entry in enumerate(self.entries):
+            for tag in entry.tags or (UNTAGGED,):
+                postings[tag].add(i)
+        self._postings = {tag: frozenset(ids) for tag, ids in postings.items()}
+
+    def tags(self):
+        return sorted(self._postings)
+
+    def count(self, tag):
+        return len(self._postings.get(tag, ()))
+
+    def counts(self, ids=None):
+        if ids is None:
+            return {tag: len(posting) for tag, posting in self._postings.items()}
+        ids = ids if isinstance(ids, (set, frozenset)) else set(ids)
+        return {tag: n for tag, posting in self._postings.items() if (n := len(posting & ids))}
+
+    def ids_for(self, tag):
+        return self._postings.get(tag, frozenset())
+
+    def query_ids(self, all_of=(), any_of=(), none_of=()):
+        # all_of: AND, any_of: OR, none_of: NOT; no constraints matches everything
+        result = None
+        for tag in sorted(all_of, key=self.count):
+            posting = self.ids_for(tag)
+            result = posting if result is None else result & posting
+            if not result:
+                return []
+        if any_of:
+            union = frozenset().union(*(self.ids_for(tag) for tag in any_of))
+            result = union if result is None else result & union
+        if result is None:
+            result = self.all_ids
+        for tag in none_of:
+            result = result - self.ids_for(tag)
+        return sorted(result)
+
+    def query(self, all_of=(), any_of=(), none_of=()):
+        return [self.entries[i] for i in self.query_ids(all_of, any_of, none_of)]
@@ -0,0 +1,66 @@
+import os
+from PIL import Image, ImageDraw, ImageFont, ImageTk
+from globals import TAG_COLOR_MAP
+
+# Tag pills are drawn once per (text, colors, size) into a small image and
+# reused by every picker row, so showing a row never creates per-pill widgets
+# with their own fonts or forces a layout pass to learn a pill's width.
+PILL_FONT_PATH = os.path.join("fonts", "Arial.ttf")
+PILL_TEXT_PX = 11
+PILL_PAD_X = 5
+PILL_PAD_Y = 2
+PILL_BORDER = "#000000"
+DEFAULT_PILL_COLORS = ("#444", "white")
+
+_FONTS = {}
+_WIDTHS = {}  # (text, size) -> pill width in pixels
+_IMAGES = {}  # (text, bg, fg, size) -> PhotoImage
+
+
+def pill_colors(tag):
+    return tuple(TAG_COLOR_MAP.get(tag, DEFAULT_PILL_COLORS))
+
+
+def _font(size):
+    font = _FONTS.get(size)
+    if font is None:
+        try:
+            font = ImageFont.truetype(PILL_FONT_PATH, size)
+        except OSError:
+            font = ImageFont.load_default()
+        _FONTS[size] = font
+    return font
+
+
+def pill_height(size=PILL_TEXT_PX):
+    ascent, descent = _font(size).getmetrics()
+    return ascent + descent + 2 * PILL_PAD_Y + 2
+
+
+def pill_width(text, size=PILL_TEXT_PX):
+    key = (text, size)
+    width = _WIDTHS.get(key)
+    if width is None:
+        width = int(round(_font(size).getlength(text))) + 2 * PILL_PAD_X + 2
+        _WIDTHS[key] = width
+    return width
+
+
+def render_pill(text, bg, fg, size=PILL_TEXT_PX):
+    width, height = pill_width(text, size), pill_height(size)
+    image = Image.new("RGBA", (width, height), bg)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width - 1, height - 1), outline=PILL_BORDER)
+    draw.text((width / 2, height / 2), text, font=_font(size), fill=fg, anchor="mm")
+    return image
+
+
+def pill_image(text, colors=None, size=PILL_TEXT_PX):
+    # Must be called on the Tk thread; the PhotoImage lives as long as the app
+    bg, fg = colors or pill_colors(text)
+    key = (text, bg, fg, size)
+    photo = _IMAGES.get(key)
+    if photo is None:
+        photo = ImageTk.PhotoImage(render_pill(text, bg, fg, size))
+        _IMAGES[key] = photo
+    return photo